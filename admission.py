@@ -0,0 +1,88 @@
+import re
+import threading
+from typing import Callable, List, Optional
+from urllib.parse import urlparse
+
+# Base priority by source type: focused portals list plots, news feeds mostly do not
+TYPE_WEIGHT = {
+    "dedicated_portal": 3.0,
+    "kortinfo": 3.0,
+    "municipality_subsection": 2.0,
+    "news_feed": 1.0,
+    "minimal": 1.0,
+}
+LISTING_WORDS = re.compile(r"grund|salg|udbud|parcel|erhverv|byggefelt|udstykning|ejendom|bolig")
+LOW_VALUE = re.compile(r"[?&](page|side|p)=|/(tag|tags|kalender|arrangement|job|presse|soeg|search|print)(/|$)")
+
+
+def score_url(url: str, source_type: str) -> float:
+    """Priority of a discovered URL: source type plus listing-like words in the path."""
+    parsed = urlparse(url.lower())
+    path = parsed.path + ("?" + parsed.query if parsed.query else "")
+    score = TYPE_WEIGHT.get(source_type, 1.0)
+    score += min(3, len(set(LISTING_WORDS.findall(path))))
+    if LOW_VALUE.search(path):
+        score -= 2
+    return score
+
+
+class DiscoveryAdmission:
+    """
+    Decides which discovered URLs enter the analysis pipeline under a run-wide cap.
+
+    Every source may admit up to a fair share of the cap (its best-scored URLs)
+    as soon as it is discovered, so analysis still streams during discovery.
+    The remaining candidates wait in a scored pool; once discovery is done the
+    leftover capacity is filled round-robin across sources, best source first,
+    each source taking its next-best URL per round, up to `per_source` URLs.
+    `scorer(urls, source_type)` replaces score_url, e.g. with a trained model.
+    """
+
+    def __init__(self, cap: int, source_count: int, per_source: int,
+                 scorer: Optional[Callable[[List[str], str], List[float]]] = None):
+        self.cap = cap
+        self.scorer = scorer or (lambda urls, source_type: [score_url(url, source_type) for url in urls])
+        self.per_source = per_source
+        self.fair_share = min(per_source, max(1, cap // max(1, source_count)))
+        self.admitted = 0
+        self.admitted_by_source = {}
+        self.pending = {}  # Source id -> (source, [(score, url), ...] best first)
+        self.dropped = []  # (source_id, url) left over once the cap was reached
+        self._lock = threading.Lock()
+
+    def offer(self, source: dict, urls: List[str]) -> List[str]:
+        """Add a source's URLs; returns those admitted right away."""
+        source_id = source.get("municipality", "")
+        ranked = sorted(
+            zip(self.scorer(urls, source.get("type", "")), urls),
+            key=lambda item: -item[0]
+        )
+        with self._lock:
+            room = min(self.fair_share, self.cap - self.admitted)
+            now = [url for _, url in ranked[:max(0, room)]]
+            self.admitted += len(now)
+            self.admitted_by_source[source_id] = self.admitted_by_source.get(source_id, 0) + len(now)
+            if ranked[len(now):]:
+                self.pending[source_id] = (source, ranked[len(now):])
+        return now
+
+    def drain(self) -> List[tuple[dict, str]]:
+        """Admit waiting candidates into the remaining capacity, round-robin across sources."""
+        admitted = []
+        with self._lock:
+            queues = sorted(self.pending.values(), key=lambda item: -item[1][0][0])
+            while queues and self.admitted < self.cap:
+                for source, ranked in list(queues):
+                    source_id = source.get("municipality", "")
+                    if self.admitted >= self.cap:
+                        break
+                    if not ranked or self.admitted_by_source.get(source_id, 0) >= self.per_source:
+                        queues.remove((source, ranked))
+                        continue
+                    admitted.append((source, ranked.pop(0)[1]))
+                    self.admitted += 1
+                    self.admitted_by_source[source_id] = self.admitted_by_source.get(source_id, 0) + 1
+            for source, ranked in self.pending.values():
+                self.dropped.extend((source.get("municipality", ""), url) for _, url in ranked)
+            self.pending = {}
+        return admitted
@@ -0,0 +1,402 @@
+"""
+Scraping backends.
+
+Every scrape and map in monitor.py goes through a ScrapeBackend, selected per
+source type in DISCOVERY_CONFIG or per source in sources.json ("backend").
+All backends return Firecrawl-shaped data: scrape() gives a dict with
+"markdown", "links" and "metadata", map() gives a list of URLs.
+"""
+import asyncio
+import codecs
+import queue
+import re
+import resource
+import threading
+from typing import Iterator, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from html_markdown import html_to_markdown
+from http_session import make_session
+from ratelimit import RateLimiter
+
+
+class ScrapeBackend:
+    name = "base"
+    unavailable_reason = "Backend not available"
+
+    def available(self) -> bool:
+        return True
+
+    def map_available(self) -> bool:
+        """Whether map() can run; callers report unavailable_reason instead of calling it."""
+        return self.available()
+
+    def scrape(self, url: str, params: Optional[dict] = None) -> dict:
+        raise NotImplementedError
+
+    def map(self, url: str, params: Optional[dict] = None) -> List[str]:
+        raise NotImplementedError
+
+
+class FirecrawlBackend(ScrapeBackend):
+    """Firecrawl API; every call draws from the shared plan rate limiter."""
+
+    name = "firecrawl"
+    unavailable_reason = "Firecrawl not initialized"
+
+    def __init__(self, app, limiter: RateLimiter):
+        self.app = app
+        self.limiter = limiter
+
+    def available(self) -> bool:
+        return self.app is not None
+
+    def scrape(self, url: str, params: Optional[dict] = None) -> dict:
+        self.limiter.acquire()
+        return self.app.scrape_url(url, params=params)
+
+    def map(self, url: str, params: Optional[dict] = None) -> List[str]:
+        self.limiter.acquire()
+        result = self.app.map_url(url, params=params)
+        # map_url returns a list directly
+        return result if isinstance(result, list) else result.get("links", [])
+
+
+class Crawl4aiBackend(ScrapeBackend):
+    """
+    Local headless browser via crawl4ai (optional dependency, Python 3.10+).
+
+    No rate limit and no credits. One browser is started lazily on first use
+    and shared by every source for the rest of the run; it lives on a private
+    event loop thread so the thread-pooled pipeline can call it synchronously.
+    scrape_many() batches URLs through crawl4ai's memory-adaptive dispatcher
+    with at most `page_concurrency` pages open. map() renders the landing page
+    and ranks its same-site links by keyword hits, as map_url's search does.
+    """
+
+    name = "crawl4ai"
+    unavailable_reason = "crawl4ai not installed"
+
+    def __init__(self, page_concurrency: int = 4, memory_threshold_percent: float = 80.0,
+                 host_delay: float = 1.0):
+        self.page_concurrency = page_concurrency
+        self.memory_threshold_percent = memory_threshold_percent
+        self.host_delay = host_delay
+        self.pages = 0
+        self.peak_rss_bytes = 0
+        self._crawler = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        try:
+            import crawl4ai  # noqa: F401
+            self._installed = True
+        except ImportError:
+            self._installed = False
+
+    def available(self) -> bool:
+        return self._installed
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._crawler is not None:
+                return
+            from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="crawl4ai-loop", daemon=True)
+            self._thread.start()
+            crawler = AsyncWebCrawler(config=BrowserConfig(headless=True))
+            asyncio.run_coroutine_threadsafe(crawler.start(), self._loop).result()
+            self._crawler = crawler
+            print(f"crawl4ai browser started (page concurrency {self.page_concurrency})", flush=True)
+
+    def _run_config(self, stream: bool = False):
+        from crawl4ai import CrawlerRunConfig
+
+        return CrawlerRunConfig(stream=stream)
+
+    def _dispatcher(self):
+        from crawl4ai import MemoryAdaptiveDispatcher, RateLimiter as Crawl4aiRateLimiter
+
+        return MemoryAdaptiveDispatcher(
+            memory_threshold_percent=self.memory_threshold_percent,
+            max_session_permit=self.page_concurrency,
+            rate_limiter=Crawl4aiRateLimiter(base_delay=(self.host_delay, self.host_delay * 2)),
+        )
+
+    def scrape(self, url: str, params: Optional[dict] = None) -> dict:
+        self._ensure_started()
+        future = asyncio.run_coroutine_threadsafe(self._crawler.arun(url=url, config=self._run_config()), self._loop)
+        result = future.result()
+        self._sample_memory()
+        return crawl_result_to_dict(url, result)
+
+    def scrape_many(self, urls: List[str], params: Optional[dict] = None) -> Iterator[tuple[str, Optional[dict], Optional[str]]]:
+        """Scrape URLs concurrently in the shared browser, yielding (url, result, error) as each finishes."""
+        self._ensure_started()
+        results = queue.Queue()
+
+        async def run():
+            try:
+                stream = await self._crawler.arun_many(urls=urls, config=self._run_config(stream=True),
+                                                       dispatcher=self._dispatcher())
+                async for result in stream:
+                    results.put(result)
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(None)
+
+        asyncio.run_coroutine_threadsafe(run(), self._loop)
+        pending = {url.rstrip("/"): url for url in urls}
+        error = "Missing from crawl4ai batch"
+        while True:
+            item = results.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                error = f"crawl4ai batch failed: {item}"
+                break
+            url = pending.pop((getattr(item, "url", "") or "").rstrip("/"), None)
+            if url is None:
+                continue
+            self._sample_memory()
+            try:
+                yield url, crawl_result_to_dict(url, item), None
+            except Exception as e:
+                yield url, None, str(e)
+
+        for url in pending.values():
+            yield url, None, error
+
+    def map(self, url: str, params: Optional[dict] = None) -> List[str]:
+        params = params or {}
+        page = self.scrape(url)
+        return rank_links(url, page.get("links", []), params.get("search", ""), params.get("limit", 10))
+
+    def _sample_memory(self):
+        rss = process_tree_rss()
+        with self._lock:
+            self.pages += 1
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+
+    def stats(self) -> dict:
+        """Pages rendered and peak memory, overall and per concurrent page, for runner sizing."""
+        with self._lock:
+            peak_mb = self.peak_rss_bytes / (1024 * 1024)
+            return {
+                "pages": self.pages,
+                "peak_rss_mb": round(peak_mb),
+                "per_worker_mb": round(peak_mb / max(self.page_concurrency, 1)),
+            }
+
+    def close(self):
+        """Shut down the shared browser at the end of the run."""
+        with self._lock:
+            if self._crawler is None:
+                return
+            crawler, self._crawler = self._crawler, None
+        try:
+            asyncio.run_coroutine_threadsafe(crawler.close(), self._loop).result(timeout=30)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+
+class StaticHttpBackend(ScrapeBackend):
+    """
+    Plain HTTP fetch with local HTML-to-markdown for server-rendered pages.
+
+    Uses one pooled keep-alive session for the whole run. When the static
+    result looks empty or JavaScript-dependent, or the fetch fails for any
+    reason other than a missing page, the URL is handed to the fallback
+    backend (Firecrawl). map() always delegates: discovery keeps map_url's
+    site-wide search.
+    """
+
+    name = "static"
+
+    def __init__(self, fallback: ScrapeBackend, pool_size: int = 16, timeout: float = 15,
+                 max_bytes: int = 5 * 1024 * 1024, min_text_chars: int = 300):
+        self.fallback = fallback
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.min_text_chars = min_text_chars
+        self.static_pages = 0
+        self.fallbacks = 0
+        self._lock = threading.Lock()
+        self.session = make_session(pool_size)
+
+    @property
+    def unavailable_reason(self) -> str:
+        return self.fallback.unavailable_reason
+
+    def available(self) -> bool:
+        # Static fetching itself always works; the fallback may not be configured
+        return True
+
+    def map_available(self) -> bool:
+        return self.fallback.available()
+
+    def _fetch(self, url: str) -> Optional[dict]:
+        """Fetch and convert url; None means the page needs the fallback."""
+        try:
+            with self.session.get(url, timeout=self.timeout, stream=True) as r:
+                if r.status_code in (404, 410):
+                    r.raise_for_status()
+                if r.status_code != 200:
+                    return None
+                content_type = r.headers.get("Content-Type", "").lower()
+                if "html" not in content_type:
+                    return None
+                body = r.raw.read(self.max_bytes + 1, decode_content=True)
+                if len(body) > self.max_bytes:
+                    return None
+                html = body.decode(page_encoding(content_type, body), errors="replace")
+                final_url = r.url
+        except requests.HTTPError:
+            raise
+        except requests.RequestException:
+            return None
+
+        markdown, links = html_to_markdown(html, final_url)
+        if len(markdown) < self.min_text_chars or looks_js_dependent(html, markdown):
+            return None
+        return {
+            "markdown": markdown,
+            "links": links,
+            "metadata": {"sourceURL": url, "url": final_url, "statusCode": 200, "backend": self.name},
+        }
+
+    def scrape(self, url: str, params: Optional[dict] = None) -> dict:
+        result = self._fetch(url)
+        with self._lock:
+            if result is None:
+                self.fallbacks += 1
+            else:
+                self.static_pages += 1
+        if result is not None:
+            return result
+        if not self.fallback.available():
+            # Reported like a Firecrawl page error, so it is not retried or charged
+            return {
+                "markdown": "",
+                "links": [],
+                "metadata": {
+                    "sourceURL": url,
+                    "error": f"Static fetch unusable and {self.fallback.unavailable_reason}",
+                    "backend": self.name,
+                },
+            }
+        return self.fallback.scrape(url, params)
+
+    def map(self, url: str, params: Optional[dict] = None) -> List[str]:
+        return self.fallback.map(url, params)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"static_pages": self.static_pages, "fallbacks": self.fallbacks}
+
+
+JS_MARKERS = [
+    "enable javascript", "aktiver javascript", "javascript er slået fra", "kræver javascript",
+    'id="root"></div>', 'id="app"></div>',
+]
+JS_SHELL_MAX_CHARS = 1500  # pages with more text than this are usable even if they nag about JS
+
+
+def looks_js_dependent(html: str, markdown: str) -> bool:
+    """Heuristic: the page is an app shell whose content is rendered client-side."""
+    if len(markdown) > JS_SHELL_MAX_CHARS:
+        return False
+    lowered = html.lower()
+    return any(marker in lowered for marker in JS_MARKERS)
+
+
+CHARSET_PARAM = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?([\w.:-]+)""", re.I)
+META_SNIFF_BYTES = 4096  # <meta charset> must sit near the top of <head>
+
+
+def _known_encoding(name) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name if name else None
+    except LookupError:
+        return None
+
+
+def page_encoding(content_type: str, body: bytes) -> str:
+    """
+    Charset of an HTML page: from the Content-Type header, else from a <meta>
+    tag, else UTF-8 if the body decodes as such, else a guess from the bytes.
+    (requests assumes ISO-8859-1 for text/html without a charset.)
+    """
+    match = CHARSET_PARAM.search(content_type)
+    encoding = _known_encoding(match.group(1)) if match else None
+    if not encoding:
+        match = META_CHARSET.search(body[:META_SNIFF_BYTES])
+        encoding = _known_encoding(match.group(1).decode("ascii")) if match else None
+    if encoding:
+        return encoding
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return _known_encoding(requests.compat.chardet.detect(body).get("encoding")) or "windows-1252"
+
+
+def process_tree_rss() -> int:
+    """Resident memory of this process plus its children (the browser), in bytes."""
+    try:
+        import psutil
+    except ImportError:
+        # Peak RSS in KB on Linux; children are only counted once they exit
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage * 1024
+
+    process = psutil.Process()
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def crawl_result_to_dict(url: str, result) -> dict:
+    """Convert a crawl4ai CrawlResult into the Firecrawl scrape shape."""
+    if not getattr(result, "success", True):
+        raise Exception(f"crawl4ai failed for {url}: {getattr(result, 'error_message', 'unknown error')}")
+
+    markdown = result.markdown or ""
+    # Newer crawl4ai versions return a MarkdownGenerationResult instead of a str
+    markdown = str(getattr(markdown, "raw_markdown", markdown) or "")
+
+    links = getattr(result, "links", None) or []
+    if isinstance(links, dict):
+        links = [link.get("href", "") for group in links.values() for link in group]
+    links = [urljoin(url, link if isinstance(link, str) else link.get("href", "")) for link in links]
+
+    return {
+        "markdown": markdown,
+        "links": [link for link in links if link.startswith("http")],
+        "metadata": {"sourceURL": url, "statusCode": getattr(result, "status_code", None)},
+    }
+
+
+def rank_links(base_url: str, links: List[str], keywords: str, limit: int) -> List[str]:
+    """Same-site links ordered by keyword hits in the URL, like map_url's search."""
+    host = urlparse(base_url).netloc.lower()
+    words = [w.lower() for w in keywords.split()]
+    candidates = []
+    for link in dict.fromkeys(links):
+        if urlparse(link).netloc.lower() != host or link.rstrip("/") == base_url.rstrip("/"):
+            continue
+        hits = sum(1 for w in words if w in link.lower())
+        candidates.append((-hits, link))
+    candidates.sort(key=lambda c: c[0])
+    return [link for _, link in candidates[:limit]]
@@ -0,0 +1,75 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from canonical import canonicalize_url
+from state import load_state, save_state
+
+
+class DiscoveryBacklog:
+    """
+    Persisted queue of discovered URLs that did not make it into a run.
+
+    Holds URLs cut by the per-source and global discovery caps, plus URLs
+    deferred by the credit budget or an open circuit, with their source and
+    first discovery time. The next run drains it (oldest first, round-robin
+    across sources) before spending credits on fresh discovery. Entries older
+    than `max_age_days` are dropped and listed in `expired`, so the caller can
+    take them out of the source's link snapshot; a source discovered with map
+    then offers them again, but sitemap, feed and kortinfo watermarks have
+    moved past them and they are gone for good.
+    """
+
+    def __init__(self, state_path: str, max_age_days: float = 30):
+        self.state_path = state_path
+        self.max_age = timedelta(days=max_age_days)
+        self.entries = load_state(state_path)  # URL -> {"source_id": ..., "discovered_at": ...}
+        self.expired = []  # (source_id, url) dropped for age by drain() in this run
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.entries)
+
+    def add(self, source_id: str, url: str, discovered_at: str) -> bool:
+        """Queue a URL; returns False if it was already queued (the earlier time is kept)."""
+        with self._lock:
+            if url in self.entries:
+                return False
+            self.entries[url] = {"source_id": source_id, "discovered_at": discovered_at}
+            return True
+
+    def drain(self, limit: int, source_ids: set, seen_urls: set) -> List[tuple[str, str]]:
+        """
+        Take up to `limit` URLs out of the queue as (source_id, url). URLs
+        already seen, from unknown sources, or past max age are discarded.
+        """
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        by_source = {}
+        with self._lock:
+            for url, entry in sorted(self.entries.items(), key=lambda item: item[1]["discovered_at"]):
+                expired = datetime.fromisoformat(entry["discovered_at"]) < cutoff
+                if expired or canonicalize_url(url) in seen_urls or entry["source_id"] not in source_ids:
+                    del self.entries[url]
+                    if expired and canonicalize_url(url) not in seen_urls:
+                        self.expired.append((entry["source_id"], url))
+                    continue
+                by_source.setdefault(entry["source_id"], []).append(url)
+
+            drained = []
+            queues = list(by_source.items())
+            while queues and len(drained) < limit:
+                for source_id, urls in list(queues):
+                    if len(drained) >= limit:
+                        break
+                    url = urls.pop(0)
+                    del self.entries[url]
+                    drained.append((source_id, url))
+                    if not urls:
+                        queues.remove((source_id, urls))
+        return drained
+
+    def save(self):
+        with self._lock:
+            snapshot = dict(self.entries)
+        save_state(self.state_path, snapshot)
@@ -0,0 +1,165 @@
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+from state import load_state, save_state
+
+# Firecrawl credits per call, by backend. Static fetches only cost a credit when
+# they fall back to Firecrawl (refunded otherwise); crawl4ai is free.
+CREDITS_PER_CALL = {"firecrawl": 1, "static": 1}
+
+# Prior proposals-per-credit by source type, used until a source has history
+TYPE_PRIOR_YIELD = {
+    "dedicated_portal": 0.3,
+    "kortinfo": 0.3,
+    "municipality_subsection": 0.1,
+    "news_feed": 0.05,
+    "minimal": 0.05,
+}
+PRIOR_WEIGHT = 10  # credits of pseudo-history behind the prior
+DEFAULT_EXPECTED_URLS = 2  # scrapes to keep in reserve per discovery without history
+
+
+class CreditBudget:
+    """
+    Counts Firecrawl credits per call kind and per source against a per-run
+    and/or per-month budget (0 = unlimited).
+
+    Every billable call reserves its credits first; when a reservation does
+    not fit, the work is deferred instead of started. Per-source credit and
+    proposal totals are kept across runs so sources can be ordered by
+    expected value (proposals per credit, smoothed towards a per-type prior).
+    """
+
+    def __init__(self, state_path: str, run_budget: int = 0, month_budget: int = 0):
+        self.state_path = state_path
+        self.run_budget = run_budget
+        self.month_budget = month_budget
+        self.state = load_state(state_path, {"month": "", "month_used": 0, "sources": {}})
+        month = datetime.now(timezone.utc).strftime("%Y-%m")
+        if self.state.get("month") != month:
+            self.state["month"] = month
+            self.state["month_used"] = 0
+        self.used = 0
+        self.by_kind = {}
+        self.by_source = {}
+        self.deferred_sources = []
+        self.deferred_urls = {}  # source_id -> count
+        self._lock = threading.Lock()
+
+    @property
+    def limited(self) -> bool:
+        return bool(self.run_budget or self.month_budget)
+
+    def _remaining(self) -> Optional[float]:
+        limits = []
+        if self.run_budget:
+            limits.append(self.run_budget - self.used)
+        if self.month_budget:
+            limits.append(self.month_budget - self.state["month_used"] - self.used)
+        return min(limits) if limits else None
+
+    def remaining(self) -> Optional[float]:
+        """Credits left under the tighter budget, or None when unlimited."""
+        with self._lock:
+            return self._remaining()
+
+    def reserve(self, source_id: str, kind: str, credits: int = 1, headroom: int = 0) -> bool:
+        """
+        Reserve credits for one call. `headroom` extra credits must also be
+        available (but are not reserved), e.g. the scrapes a map will lead to.
+        Returns False if the budget cannot cover it.
+        """
+        if credits <= 0:
+            return True
+        with self._lock:
+            remaining = self._remaining()
+            if remaining is not None and credits + headroom > remaining:
+                return False
+            self._charge(source_id, kind, credits)
+            return True
+
+    def refund(self, source_id: str, kind: str, credits: int = 1):
+        """Return credits for a reserved call that turned out to be free."""
+        with self._lock:
+            self._charge(source_id, kind, -credits)
+
+    def _charge(self, source_id: str, kind: str, credits: int):
+        self.used += credits
+        self.by_kind[kind] = self.by_kind.get(kind, 0) + credits
+        self.by_source[source_id] = self.by_source.get(source_id, 0) + credits
+
+    def record_discovery(self, source_id: str, urls: int):
+        with self._lock:
+            history = self.state["sources"].setdefault(source_id, {})
+            history["discoveries"] = history.get("discoveries", 0) + 1
+            history["urls"] = history.get("urls", 0) + urls
+
+    def record_proposal(self, source_id: str):
+        with self._lock:
+            history = self.state["sources"].setdefault(source_id, {})
+            history["proposals"] = history.get("proposals", 0) + 1
+
+    def expected_value(self, source: dict) -> float:
+        """Expected proposals per credit for a source."""
+        source_id = source.get("municipality", "")
+        prior = TYPE_PRIOR_YIELD.get(source.get("type"), 0.05)
+        with self._lock:
+            history = self.state["sources"].get(source_id, {})
+        return (history.get("proposals", 0) + prior * PRIOR_WEIGHT) / (history.get("credits", 0) + PRIOR_WEIGHT)
+
+    def expected_urls(self, source_id: str) -> int:
+        """Average new URLs per discovery for a source (scrapes to budget for)."""
+        with self._lock:
+            history = self.state["sources"].get(source_id, {})
+        if not history.get("discoveries"):
+            return DEFAULT_EXPECTED_URLS
+        return round(history.get("urls", 0) / history["discoveries"])
+
+    def defer_source(self, source_id: str):
+        with self._lock:
+            self.deferred_sources.append(source_id)
+
+    def defer_url(self, source_id: str):
+        with self._lock:
+            self.deferred_urls[source_id] = self.deferred_urls.get(source_id, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "credits_used": self.used,
+                "credits_by_kind": dict(self.by_kind),
+                "credits_by_source": dict(self.by_source),
+                "remaining": self._remaining(),
+                "deferred_sources": list(self.deferred_sources),
+                "deferred_urls": dict(self.deferred_urls),
+            }
+
+    def summary(self) -> str:
+        """One-line budget report for the events row."""
+        stats = self.stats()
+        limits = []
+        if self.run_budget:
+            limits.append(f"run budget {self.run_budget}")
+        if self.month_budget:
+            limits.append(f"month {self.state['month_used'] + stats['credits_used']}/{self.month_budget}")
+        text = f"Credits: {stats['credits_used']}" + (f" ({', '.join(limits)})" if limits else "")
+        deferred = []
+        if stats["deferred_sources"]:
+            deferred.append(f"{len(stats['deferred_sources'])} sources ({', '.join(stats['deferred_sources'])})")
+        if stats["deferred_urls"]:
+            per_source = ", ".join(f"{source_id}: {count}" for source_id, count in sorted(stats["deferred_urls"].items()))
+            deferred.append(f"{sum(stats['deferred_urls'].values())} URLs ({per_source})")
+        if deferred:
+            text += " | Deferred (budget): " + "; ".join(deferred)
+        return text
+
+    def save(self):
+        """Add this run's usage to the month total and per-source history (once per run)."""
+        with self._lock:
+            self.state["month_used"] += self.used
+            for source_id, credits in self.by_source.items():
+                history = self.state["sources"].setdefault(source_id, {})
+                history["credits"] = history.get("credits", 0) + credits
+            snapshot = dict(self.state)
+        save_state(self.state_path, snapshot)
@@ -0,0 +1,41 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that never change page content: campaign tracking and session ids
+TRACKING_PARAMS = re.compile(
+    r"^(utm_.*|fbclid|gclid|msclkid|mc_cid|mc_eid|_ga|_gl|jsessionid|phpsessid|aspsessionid.*|sessionid|session_id)$",
+    re.IGNORECASE
+)
+PATH_SESSION = re.compile(r";(jsessionid|sessionid)=[^/?#]*", re.IGNORECASE)
+DEFAULT_PORTS = {":80", ":443"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so the same page always has the same seen_urls key:
+    https, lower-case host without default port, no fragment, no tracking or
+    session parameters, remaining parameters sorted, no trailing slash.
+    Strings that are not http(s) URLs are returned stripped but unchanged.
+    The result is an identity key only: pages are fetched at the URL as found,
+    since a site may not serve https or may need the trailing slash.
+    """
+    url = (url or "").strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if parts.scheme.lower() not in ("http", "https") or not parts.netloc:
+        return url
+
+    netloc = parts.netloc.lower()
+    for port in DEFAULT_PORTS:
+        if netloc.endswith(port):
+            netloc = netloc[:-len(port)]
+    path = PATH_SESSION.sub("", parts.path) or "/"
+    if path != "/":
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not TRACKING_PARAMS.match(key)
+    ))
+    return urlunsplit(("https", netloc, path, query, ""))
@@ -0,0 +1,96 @@
+import threading
+from datetime import datetime, timezone
+
+import requests
+
+from politeness import host_of
+from state import load_state, save_state
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"  # Tripped in an earlier run: the first result decides
+BROWSER_NETWORK_ERRORS = ("net::err_", "timeout")  # crawl4ai failures that mean the site did not answer
+
+
+class SiteFailure(Exception):
+    """The target site itself failed, e.g. a scraped page came back with a 5xx status."""
+
+
+def is_site_failure(url: str, error) -> bool:
+    """
+    True if `error` shows url's site failing: a SiteFailure, a connection error
+    or timeout on a direct request to its host, or a network error from the
+    local crawl4ai browser. Firecrawl-side errors, local bugs and an exhausted
+    retry budget say nothing about the site and do not count.
+    """
+    if isinstance(error, SiteFailure):
+        return True
+    if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        request = getattr(error, "request", None)
+        return request is not None and host_of(request.url) == host_of(url)
+    message = str(error).lower()
+    return "crawl4ai" in message and any(marker in message for marker in BROWSER_NETWORK_ERRORS)
+
+
+class CircuitBreaker:
+    """
+    Per-domain circuit breaker for one run.
+
+    A domain's circuit opens after `threshold` consecutive failures of the site
+    itself (see is_site_failure) and stays open for the rest of the run, so the
+    remaining URLs on that domain fail immediately instead of burning retries
+    and credits.
+    Domains that were open at the end of a run start the next run half-open:
+    the first success closes the circuit again, the first failure reopens it.
+    """
+
+    def __init__(self, state_path: str, threshold: int = 3):
+        self.state_path = state_path
+        self.threshold = threshold
+        self._failures = {}  # host -> consecutive failures
+        self._opened = load_state(state_path)  # host -> {"opened_at": ..., "failures": ...}
+        self._states = {host: HALF_OPEN for host in self._opened}
+        self._lock = threading.Lock()
+
+    def allow(self, url: str) -> bool:
+        """Return False if url's domain has an open circuit."""
+        host = host_of(url)
+        with self._lock:
+            return self._states.get(host) != OPEN
+
+    def record_success(self, url: str):
+        host = host_of(url)
+        with self._lock:
+            self._failures[host] = 0
+            if self._states.get(host) == HALF_OPEN:
+                print(f"  Circuit closed for {host} (site is back)")
+                self._states[host] = CLOSED
+                self._opened.pop(host, None)
+
+    def record_failure(self, url: str):
+        host = host_of(url)
+        with self._lock:
+            failures = self._failures.get(host, 0) + 1
+            self._failures[host] = failures
+            state = self._states.get(host, CLOSED)
+            if state == OPEN or (state == CLOSED and failures < self.threshold):
+                return
+            self._states[host] = OPEN
+            self._opened[host] = {
+                "opened_at": datetime.now(timezone.utc).isoformat(),
+                "failures": failures,
+            }
+        print(f"  ⚡ Circuit opened for {host} after {failures} consecutive failures")
+
+    def open_hosts(self) -> list:
+        with self._lock:
+            return sorted(host for host, state in self._states.items() if state == OPEN)
+
+    def save(self):
+        """
+        Persist domains that are still open (or were never retried) so the next
+        run starts them half-open.
+        """
+        with self._lock:
+            snapshot = dict(self._opened)
+        save_state(self.state_path, snapshot)
@@ -0,0 +1,51 @@
+import threading
+from typing import Callable, Hashable
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait and get the same result (or exception). Nothing is
+    cached once the call has finished.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable) -> tuple[object, bool]:
+        """Run fn once per in-flight key. Returns: (result, shared) - shared is True for waiters."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+            return call.result, False
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
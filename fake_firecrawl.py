@@ -0,0 +1,92 @@
+"""
+Offline stand-in for FirecrawlApp.
+
+Enabled with FIRECRAWL_FAKE=1 so the full pipeline (discovery, single and
+batch scrapes) can be exercised without network access or credits. Content
+is generated deterministically from the URL; URLs containing "404" return a
+404 status and URLs containing "fail" raise like an API error would.
+"""
+import itertools
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, headers: Optional[dict] = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeFirecrawlApp:
+    """Mimics the FirecrawlApp methods monitor.py uses, plus batch scrape."""
+
+    api_url = "http://fake-firecrawl.local"
+
+    def __init__(self, latency: float = 0.05, batch_concurrency: int = 10):
+        self.latency = latency
+        self.batch_concurrency = batch_concurrency
+        self.calls = {"scrape_url": 0, "map_url": 0, "batch": 0}
+        self._jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _page(self, url: str) -> Dict[str, Any]:
+        if "fail" in url:
+            raise requests.exceptions.HTTPError(
+                f"Internal Server Error: Failed to scrape URL. Fake failure for {url}",
+                response=_FakeResponse(500)
+            )
+        status_code = 404 if "404" in url else 200
+        host = urlparse(url).netloc
+        slug = urlparse(url).path.strip("/").replace("/", " ") or "forside"
+        markdown = f"# {slug}\n\nSide fra {host}. Grunde til salg i området: {slug}.\n"
+        links = [f"https://{host}/grunde/{slug.replace(' ', '-')}-{i}" for i in range(3)]
+        return {
+            "markdown": markdown,
+            "links": links,
+            "metadata": {"sourceURL": url, "statusCode": status_code, "title": slug},
+        }
+
+    def scrape_url(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        with self._lock:
+            self.calls["scrape_url"] += 1
+        time.sleep(self.latency)
+        return self._page(url)
+
+    def map_url(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        with self._lock:
+            self.calls["map_url"] += 1
+        time.sleep(self.latency)
+        limit = (params or {}).get("limit", 5)
+        base = url.rstrip("/")
+        return [f"{base}/grund-{i}" for i in range(limit)]
+
+    def async_batch_scrape_urls(self, urls: List[str], params: Optional[Dict[str, Any]] = None) -> dict:
+        with self._lock:
+            self.calls["batch"] += 1
+            job_id = f"fake-batch-{next(self._ids)}"
+            self._jobs[job_id] = {"urls": list(urls), "started": time.monotonic()}
+        return {"success": True, "id": job_id}
+
+    def check_batch_scrape_status(self, job_id: str) -> dict:
+        job = self._jobs[job_id]
+        elapsed = time.monotonic() - job["started"]
+        # Pages finish in waves of `batch_concurrency`, each taking `latency`
+        done = min(len(job["urls"]), int(elapsed / max(self.latency, 1e-6)) * self.batch_concurrency)
+        data = []
+        for url in job["urls"][:done]:
+            try:
+                data.append(self._page(url))
+            except requests.exceptions.HTTPError:
+                data.append({"metadata": {"sourceURL": url, "statusCode": 500, "error": "Fake failure"}})
+        return {
+            "success": True,
+            "status": "completed" if done == len(job["urls"]) else "scraping",
+            "total": len(job["urls"]),
+            "completed": done,
+            "data": data,
+        }
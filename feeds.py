@@ -0,0 +1,188 @@
+import re
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from canonical import canonicalize_url
+from http_session import make_session
+from sitemap import EPOCH, RECHECK_DAYS, local_name, parse_lastmod
+from state import load_state, save_state
+
+FEED_TYPES = ("application/rss+xml", "application/atom+xml")
+FEED_LINK = re.compile(r"<link\b[^>]*>", re.I)
+COMMON_FEED_PATHS = ["/rss", "/feed", "/rss.xml", "/atom.xml"]
+
+
+def parse_feed_date(value: Optional[str]) -> Optional[datetime]:
+    """Parse an RSS (RFC 822) date, or an Atom one (W3C, as in sitemaps), as UTC."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value.strip())
+    except (TypeError, ValueError):
+        return parse_lastmod(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def parse_feed(content: bytes, base_url: str) -> List[dict]:
+    """Items of an RSS or Atom document as {"url", "title", "summary", "published"}."""
+    root = ET.fromstring(content)
+    if local_name(root.tag) not in ("rss", "feed", "RDF"):
+        raise ET.ParseError(f"not a feed: <{local_name(root.tag)}>")
+    items = []
+    for element in root.iter():
+        if local_name(element.tag) not in ("item", "entry"):
+            continue
+        item = {"url": None, "title": "", "summary": "", "published": None}
+        for child in element:
+            name = local_name(child.tag)
+            text = (child.text or "").strip()
+            if name == "link":
+                # Atom: <link rel="alternate" href="..."/>, RSS: <link>...</link>
+                href = child.get("href")
+                if href and child.get("rel", "alternate") == "alternate":
+                    item["url"] = urljoin(base_url, href)
+                elif text and not item["url"]:
+                    item["url"] = urljoin(base_url, text)
+            elif name == "title":
+                item["title"] = text
+            elif name in ("description", "summary") or (name == "content" and not item["summary"]):
+                item["summary"] = re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", text)).strip()
+            elif name in ("pubDate", "published", "updated", "date") and item["published"] is None:
+                item["published"] = parse_feed_date(text)
+        if item["url"]:
+            items.append(item)
+    return items
+
+
+def matches_keywords(item: dict, keywords: str) -> bool:
+    """Cheap pre-classification: does the item's title or summary mention any keyword stem?"""
+    text = f"{item.get('title', '')} {item.get('summary', '')}".lower()
+    return any(keyword in text for keyword in keywords.lower().split())
+
+
+class FeedDiscovery:
+    """
+    Discovery for news_feed sources from their RSS/Atom feeds.
+
+    Feeds are autodiscovered from <link rel="alternate"> tags on the source
+    page (or common feed paths) and remembered per source. Each poll is a
+    conditional GET, and only items published after the source's watermark
+    are returned, so an unchanged feed costs one 304 and no credits. As with
+    sitemaps, the watermark (and the feed's validators) only move when no
+    item was cut off by the limit. Returns None when a source has no feed;
+    the caller falls back to map.
+    """
+
+    def __init__(self, state_path: str, pool_size: int = 4, timeout: float = 15):
+        self.state_path = state_path
+        self.timeout = timeout
+        self.state = load_state(state_path)
+        self.served = set()  # Source ids discovered from a feed in this run
+        self._lock = threading.Lock()
+        self.session = make_session(pool_size)
+
+    def _find_feeds(self, base_url: str) -> List[str]:
+        feeds = []
+        try:
+            response = self.session.get(base_url, timeout=self.timeout)
+            for tag in FEED_LINK.findall(response.text):
+                attrs = dict(re.findall(r'(\w+)\s*=\s*["\']([^"\']*)["\']', tag))
+                if attrs.get("rel", "").lower() == "alternate" and attrs.get("type", "").lower() in FEED_TYPES:
+                    feeds.append(urljoin(response.url or base_url, attrs.get("href", "")))
+        except requests.RequestException:
+            pass
+        if feeds:
+            return feeds
+        parsed = urlparse(base_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        return [base_url.rstrip("/") + path for path in COMMON_FEED_PATHS] + [root + path for path in COMMON_FEED_PATHS]
+
+    def _poll(self, feed_url: str, entry: dict):
+        """Conditional GET of a feed. Returns (items, validators); items is [] on 304, None if not a feed."""
+        headers = {}
+        if entry.get("feed") == feed_url:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        response = self.session.get(feed_url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return [], {}
+        if response.status_code != 200:
+            return None, {}
+        try:
+            items = parse_feed(response.content, response.url or feed_url)
+        except ET.ParseError:
+            return None, {}
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        return items, validators
+
+    def discover(self, source: dict, keywords: str, limit: int, seen_urls: Iterable[str] = ()) -> Optional[List[dict]]:
+        """
+        Up to `limit` feed items newer than the source's watermark, newest first,
+        that mention one of `keywords` and are not in `seen_urls` (None: no feed).
+        """
+        source_id = source.get("municipality", "")
+        base_url = source.get("url", "")
+        with self._lock:
+            entry = dict(self.state.get(source_id, {}))
+        now = datetime.now(timezone.utc)
+        checked_at = entry.get("checked_at")
+        if entry.get("no_feed") and checked_at and now - datetime.fromisoformat(checked_at) < timedelta(days=RECHECK_DAYS):
+            return None
+
+        candidates = [entry["feed"]] if entry.get("feed") else self._find_feeds(base_url)
+        for feed_url in candidates:
+            try:
+                items, validators = self._poll(feed_url, entry)
+            except requests.RequestException as e:
+                if entry.get("feed"):
+                    # Known feed temporarily down: map this run, keep the feed
+                    print(f"  Warning: Feed {feed_url} unavailable: {e}")
+                    return None
+                items = None
+            if items is None:
+                continue
+
+            watermark = datetime.fromisoformat(entry["watermark"]) if entry.get("watermark") and entry.get("feed") == feed_url else EPOCH
+            fresh = [item for item in items if item["published"] is None or item["published"] > watermark]
+            # Pre-classify on title/summary; the watermark means rejected items are not offered again
+            relevant = [
+                item for item in fresh
+                if matches_keywords(item, keywords)
+                and canonicalize_url(item["url"]) not in seen_urls
+                and not item["url"].lower().endswith(".pdf")
+            ]
+            relevant.sort(key=lambda item: item["published"] or now, reverse=True)
+            if len(relevant) <= limit:
+                newest = max([watermark] + [item["published"] for item in items if item["published"]])
+                updated = {"feed": feed_url, "watermark": newest.isoformat(), "checked_at": now.isoformat()}
+                updated.update(validators or {key: entry.get(key) for key in ("etag", "last_modified")})
+            else:
+                # Cut off: poll the same items again next run, when the returned ones are seen
+                updated = {"feed": feed_url, "watermark": watermark.isoformat(), "checked_at": now.isoformat()}
+                if entry.get("feed") == feed_url:
+                    updated.update({key: entry.get(key) for key in ("etag", "last_modified")})
+            with self._lock:
+                self.state[source_id] = updated
+                self.served.add(source_id)
+            print(f"  Feed {feed_url}: {len(fresh)} new items, {len(fresh) - len(relevant)} off-topic or seen"
+                  + (" (not modified)" if not validators else ""))
+            return relevant[:limit]
+
+        with self._lock:
+            self.state[source_id] = {"no_feed": True, "checked_at": now.isoformat()}
+        return None
+
+    def save(self):
+        with self._lock:
+            snapshot = dict(self.state)
+        save_state(self.state_path, snapshot)
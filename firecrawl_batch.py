@@ -0,0 +1,101 @@
+import time
+from typing import Callable, Iterator, List, Optional
+
+import requests
+
+IN_PROGRESS_STATUSES = {"scraping", "active", "pending", "queued", "waiting", "paused"}
+
+
+class FirecrawlBatchClient:
+    """
+    Firecrawl batch-scrape jobs (POST /v1/batch/scrape) with streamed results.
+
+    firecrawl-py 1.0.0 has no batch methods, so this talks to the REST API
+    directly unless the app object provides `async_batch_scrape_urls` /
+    `check_batch_scrape_status` (newer SDKs and FakeFirecrawlApp do).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def start(self, urls: List[str], params: Optional[dict] = None) -> str:
+        """Submit a batch job and return its id."""
+        params = params or {"formats": ["markdown"]}
+        if hasattr(self.app, "async_batch_scrape_urls"):
+            response = self.app.async_batch_scrape_urls(urls, params)
+        else:
+            r = requests.post(
+                f"{self.app.api_url}/v1/batch/scrape",
+                headers=self.app._prepare_headers(),
+                json={"urls": urls, **params},
+                timeout=30
+            )
+            r.raise_for_status()
+            response = r.json()
+        if not response.get("success", True) or not response.get("id"):
+            raise Exception(f"Failed to start batch scrape. Error: {response.get('error')}")
+        return response["id"]
+
+    def status(self, job_id: str) -> dict:
+        """Fetch job status including every result completed so far (follows `next` pages)."""
+        if hasattr(self.app, "check_batch_scrape_status"):
+            return self.app.check_batch_scrape_status(job_id)
+
+        url = f"{self.app.api_url}/v1/batch/scrape/{job_id}"
+        status = None
+        data = []
+        while url:
+            r = requests.get(url, headers=self.app._prepare_headers(), timeout=30)
+            r.raise_for_status()
+            page = r.json()
+            status = status or page
+            data.extend(page.get("data", []))
+            url = page.get("next")
+        status["data"] = data
+        return status
+
+    def iter_results(self, job_id: str, urls: List[str], poll_interval: float = 2.0,
+                     timeout: float = 900.0, retry: Optional[Callable] = None
+                     ) -> Iterator[tuple[str, Optional[dict], Optional[str]]]:
+        """
+        Poll a job and yield (url, result, error) as soon as each URL completes.
+        Each poll goes through `retry(fn, description=...)` when given (e.g.
+        RetryPolicy.call). URLs the job never returned, or that were pending
+        when polling failed for good, are yielded with an error at the end.
+        """
+        pending = {_url_key(url): url for url in urls}
+        deadline = time.monotonic() + timeout
+
+        while pending:
+            try:
+                if retry:
+                    status = retry(lambda: self.status(job_id), description=f"batch {job_id} status")
+                else:
+                    status = self.status(job_id)
+            except Exception as e:
+                error = f"Batch status check failed: {e}"
+                break
+            for item in status.get("data", []) or []:
+                metadata = item.get("metadata", {}) or {}
+                key = _url_key(metadata.get("sourceURL") or metadata.get("url") or "")
+                url = pending.pop(key, None)
+                if url:
+                    yield url, item, None
+
+            state = status.get("status")
+            if state not in IN_PROGRESS_STATUSES:
+                error = f"Missing from batch result (job {state})"
+                break
+            if time.monotonic() > deadline:
+                error = f"Batch job {job_id} timed out after {timeout:.0f}s"
+                break
+            time.sleep(poll_interval)
+        else:
+            return
+
+        for url in pending.values():
+            yield url, None, error
+
+
+def _url_key(url: str) -> str:
+    return url.rstrip("/")
@@ -0,0 +1,103 @@
+"""
+Minimal HTML to markdown conversion for server-rendered municipality pages.
+
+Produces the parts classification and extraction rely on - headings,
+paragraphs, lists, links and emphasis - and drops scripts, styles and page
+chrome. It is not a general-purpose converter.
+"""
+import re
+from html.parser import HTMLParser
+from typing import List
+from urllib.parse import urljoin
+
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg", "iframe", "head", "form"}
+CHROME_TAGS = {"nav", "footer", "aside"}
+BLOCK_TAGS = {"p", "div", "section", "article", "main", "table", "tr", "blockquote", "figure", "dl", "dd", "dt"}
+HEADINGS = {"h1": "# ", "h2": "## ", "h3": "### ", "h4": "#### ", "h5": "##### ", "h6": "###### "}
+VOID_TAGS = {"br", "img", "hr", "meta", "link", "input", "source", "wbr", "area", "base", "col", "embed", "param", "track"}
+
+
+class _MarkdownParser(HTMLParser):
+    def __init__(self, base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.out = []
+        self.links = []
+        self.skip_depth = 0
+        self.chrome_depth = 0
+        self.href_stack = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            if tag == "br" and not self.skip_depth:
+                self.out.append("\n")
+            return
+        if tag in SKIP_TAGS:
+            self.skip_depth += 1
+            return
+        if tag in CHROME_TAGS:
+            self.chrome_depth += 1
+        if tag == "a":
+            href = dict(attrs).get("href") or ""
+            absolute = urljoin(self.base_url, href) if href and not href.startswith(("#", "javascript:", "mailto:", "tel:")) else ""
+            if absolute:
+                self.links.append(absolute)
+            self.href_stack.append(absolute)
+            if absolute and not self.skip_depth and not self.chrome_depth:
+                self.out.append("[")
+        elif self.skip_depth or self.chrome_depth:
+            return
+        elif tag in HEADINGS:
+            self.out.append("\n\n" + HEADINGS[tag])
+        elif tag == "li":
+            self.out.append("\n- ")
+        elif tag in ("strong", "b"):
+            self.out.append("**")
+        elif tag in ("em", "i"):
+            self.out.append("_")
+        elif tag in BLOCK_TAGS:
+            self.out.append("\n\n")
+        elif tag in ("td", "th"):
+            self.out.append(" | ")
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self.skip_depth = max(self.skip_depth - 1, 0)
+            return
+        if tag == "a":
+            href = self.href_stack.pop() if self.href_stack else ""
+            if href and not self.skip_depth and not self.chrome_depth:
+                self.out.append(f"]({href})")
+        if tag in CHROME_TAGS:
+            self.chrome_depth = max(self.chrome_depth - 1, 0)
+            return
+        if self.skip_depth or self.chrome_depth:
+            return
+        if tag in HEADINGS or tag in BLOCK_TAGS:
+            self.out.append("\n\n")
+        elif tag in ("ul", "ol"):
+            self.out.append("\n")
+        elif tag in ("strong", "b"):
+            self.out.append("**")
+        elif tag in ("em", "i"):
+            self.out.append("_")
+
+    def handle_data(self, data):
+        if self.skip_depth or self.chrome_depth:
+            return
+        self.out.append(re.sub(r"\s+", " ", data))
+
+
+def html_to_markdown(html: str, base_url: str = "") -> tuple[str, List[str]]:
+    """
+    Convert HTML to markdown.
+    Returns: (markdown, links) - links are absolute and in document order, nav/footer included
+    """
+    parser = _MarkdownParser(base_url)
+    parser.feed(html)
+    parser.close()
+    markdown = "".join(parser.out)
+    markdown = re.sub(r"[ \t]+\n", "\n", markdown)
+    markdown = re.sub(r"\n[ \t]+", "\n", markdown)
+    markdown = re.sub(r"\n{3,}", "\n\n", markdown).strip()
+    return markdown, list(dict.fromkeys(parser.links))
@@ -0,0 +1,14 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Mozilla/5.0 (compatible; GrundsalgMonitor/1.0)"
+
+
+def make_session(pool_size: int = 4) -> requests.Session:
+    """A requests session with the monitor's User-Agent, pooling connections for `pool_size` threads."""
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
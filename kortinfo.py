@@ -0,0 +1,175 @@
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from canonical import canonicalize_url
+from http_session import make_session
+from state import load_state, save_state
+
+ID_KEYS = ("id", "plotid", "grundid", "matrikelnr", "nummer", "nr")
+STATUS_KEYS = ("status", "salgsstatus", "state", "tilstand")
+URL_KEYS = ("url", "link", "href", "permalink")
+# Same-origin URLs in the SPA shell or its scripts that may serve the plot data
+ENDPOINT_CANDIDATE = re.compile(r"""["'`]((?:https?://[^"'`\s]+)?/[^"'`\s]*(?:api|data|json|service)[^"'`\s]*)["'`]""", re.I)
+MIN_GUESSED_PLOTS = 2  # a guessed endpoint must list at least this many plots
+MAX_CANDIDATES = 10  # endpoint guesses tried per site before giving up
+MAX_SCRIPTS = 5
+RECHECK_DAYS = 7  # how long a "no data layer" result is trusted before looking again
+
+
+def _lower_keys(record: dict) -> dict:
+    return {str(key).lower(): value for key, value in record.items()}
+
+
+def extract_plots(data) -> List[dict]:
+    """
+    Find plot records anywhere in a JSON document: dicts with an id-like and
+    a status-like key. Returns [{"id", "status", "url"}], url None when the
+    record has no link.
+    """
+    plots = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(reversed(node))
+        elif isinstance(node, dict):
+            record = _lower_keys(node)
+            plot_id = next((record[key] for key in ID_KEYS if isinstance(record.get(key), (str, int))), None)
+            status = next((record[key] for key in STATUS_KEYS if isinstance(record.get(key), (str, int))), None)
+            if plot_id is not None and status is not None:
+                plots.append({
+                    "id": str(plot_id),
+                    "status": str(status),
+                    "url": next((record[key] for key in URL_KEYS if isinstance(record.get(key), str)), None),
+                })
+            stack.extend(value for value in node.values() if isinstance(value, (list, dict)))
+    return plots
+
+
+class KortinfoDataLayer:
+    """
+    Discovery for kortinfo grundsalg sites from their JSON data layer.
+
+    The SPA loads its plot list from a backend endpoint; reading that directly
+    avoids a JS-rendered Firecrawl scrape. The endpoint comes from the source's
+    "data_url" in sources.json, or is looked for in the SPA shell and its
+    scripts and remembered per site. Plot ids and statuses are kept between
+    runs, so only new plots and status changes lead to URLs. A plot without
+    its own page leads to the landing page, which is then listed in `refresh`
+    so the caller re-analyses it even though it was seen before. Returns None
+    when no data layer is found, and the caller falls back to scraping the SPA.
+    """
+
+    def __init__(self, state_path: str, pool_size: int = 4, timeout: float = 15):
+        self.state_path = state_path
+        self.timeout = timeout
+        self.state = load_state(state_path)
+        self.served = set()  # Source ids discovered from the data layer in this run
+        self.changes = {}  # Source id -> {"new": [...], "status_changed": [...]} for this run
+        self.refresh = set()  # Canonical landing URLs to re-analyse in this run
+        self._lock = threading.Lock()
+        self.session = make_session(pool_size)
+
+    def _get_json(self, url: str):
+        response = self.session.get(url, headers={"Accept": "application/json"}, timeout=self.timeout)
+        if response.status_code != 200:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return None
+
+    def _candidates(self, base_url: str) -> List[str]:
+        host = urlparse(base_url).netloc
+        response = self.session.get(base_url, timeout=self.timeout)
+        texts = [response.text]
+        scripts = re.findall(r"""<script[^>]+src=["']([^"']+)["']""", response.text, re.I)
+        for src in scripts[:MAX_SCRIPTS]:
+            script_url = urljoin(base_url, src)
+            if urlparse(script_url).netloc == host:
+                try:
+                    texts.append(self.session.get(script_url, timeout=self.timeout).text)
+                except requests.RequestException:
+                    continue
+        candidates = []
+        for text in texts:
+            for match in ENDPOINT_CANDIDATE.findall(text):
+                url = urljoin(base_url, match)
+                if urlparse(url).netloc == host and not url.endswith((".js", ".css")) and url not in candidates:
+                    candidates.append(url)
+        return candidates[:MAX_CANDIDATES]
+
+    def _find_endpoint(self, source: dict, entry: dict) -> tuple[Optional[str], list]:
+        """Return (endpoint, data) for the site's plot data, or (None, None)."""
+        base_url = source.get("url", "")
+        known = [url for url in (source.get("data_url"), entry.get("endpoint")) if url]
+        checked_at = entry.get("checked_at")
+        if entry.get("no_endpoint") and not known and checked_at and (
+                datetime.now(timezone.utc) - datetime.fromisoformat(checked_at) < timedelta(days=RECHECK_DAYS)):
+            return None, None
+        for url in known:
+            data = self._get_json(url)
+            if data is not None and extract_plots(data):
+                return url, data
+        # The remembered endpoint may have moved; look for it again
+        for url in self._candidates(base_url):
+            if url not in known:
+                data = self._get_json(url)
+                if data is not None and len(extract_plots(data)) >= MIN_GUESSED_PLOTS:
+                    return url, data
+        return None, None
+
+    def discover(self, source: dict) -> Optional[List[str]]:
+        """URLs for plots that are new or changed status since the last run (None: no data layer)."""
+        source_id = source.get("municipality", "")
+        base_url = source.get("url", "")
+        with self._lock:
+            entry = dict(self.state.get(source_id, {}))
+        try:
+            endpoint, data = self._find_endpoint(source, entry)
+        except requests.RequestException as e:
+            print(f"  Kortinfo data layer unavailable for {base_url}: {e}")
+            return None
+        if endpoint is None:
+            with self._lock:
+                self.state[source_id] = {
+                    **{key: value for key, value in entry.items() if key != "endpoint"},
+                    "no_endpoint": True,
+                    "checked_at": entry.get("checked_at") if entry.get("no_endpoint") else datetime.now(timezone.utc).isoformat(),
+                }
+            return None
+
+        plots = extract_plots(data)
+        previous = entry.get("plots", {})
+        new = [plot for plot in plots if plot["id"] not in previous]
+        changed = [plot for plot in plots if plot["id"] in previous and previous[plot["id"]] != plot["status"]]
+
+        urls = list(dict.fromkeys(urljoin(base_url, plot["url"]) for plot in new + changed if plot["url"]))
+        if any(not plot["url"] for plot in new + changed):
+            urls.append(base_url)
+
+        with self._lock:
+            self.state[source_id] = {
+                "endpoint": endpoint,
+                "plots": {plot["id"]: plot["status"] for plot in plots},
+                "checked_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self.served.add(source_id)
+            if base_url in urls:
+                self.refresh.add(canonicalize_url(base_url))
+            self.changes[source_id] = {
+                "new": [plot["id"] for plot in new],
+                "status_changed": [plot["id"] for plot in changed],
+            }
+        print(f"  Kortinfo data layer: {len(plots)} plots, {len(new)} new, {len(changed)} changed status")
+        return urls
+
+    def save(self):
+        with self._lock:
+            snapshot = dict(self.state)
+        save_state(self.state_path, snapshot)
@@ -0,0 +1,48 @@
+"""
+One-off migration: add the canonical form of every seen_urls row that is not
+already canonical, so the sheet matches what monitor.py now writes.
+
+The Apps Script webhook can only append, so the original rows stay; they are
+harmless because monitor.py canonicalizes rows when it loads them. Delete them
+by hand in the sheet if a clean list is wanted (the report lists how many).
+
+Usage: python migrate_seen_urls.py [--dry-run]
+"""
+import sys
+from datetime import datetime, timezone
+
+from canonical import canonicalize_url
+from sheets import append_row, get_rows
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv
+    timestamp = datetime.now(timezone.utc).isoformat()
+    rows = [row for row in get_rows("seen_urls") if row and row[0]]
+    raw = [row[0] for row in rows]
+    present = set(raw)
+
+    missing = []
+    non_canonical = 0
+    for url in raw:
+        canonical = canonicalize_url(url)
+        if canonical == url:
+            continue
+        non_canonical += 1
+        if canonical not in present:
+            present.add(canonical)
+            missing.append(canonical)
+
+    print(f"{len(raw)} rows, {len(set(map(canonicalize_url, raw)))} distinct pages, "
+          f"{non_canonical} non-canonical rows, {len(missing)} canonical rows to add")
+    if dry_run:
+        for url in missing:
+            print(f"  + {url}")
+        return
+    for url in missing:
+        append_row("seen_urls", [url, timestamp])
+    print(f"Added {len(missing)} rows to seen_urls")
+
+
+if __name__ == "__main__":
+    main()
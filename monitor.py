@@ -1,91 +1,443 @@
 import os
 import json
-import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 from dotenv import load_dotenv
 from firecrawl import FirecrawlApp
 from openai import OpenAI
 from sheets import append_row, get_rows
-
-# Rate limiting: Firecrawl free tier = 15 req/min, so ~4 seconds between requests
-RATE_LIMIT_DELAY = 4.5  # seconds between Firecrawl API calls
-RETRY_DELAY = 5  # seconds to wait before retrying a failed request
-MAX_RETRIES = 1  # number of retries for transient failures
+from ratelimit import RateLimiter
+from retry import PERMANENT_STATUS_CODES, RetryPolicy
+from scrape_cache import ScrapeCache
+from firecrawl_batch import FirecrawlBatchClient
+from fake_firecrawl import FakeFirecrawlApp
+from preflight import Preflight
+from politeness import HostScheduler, RobotsCache
+from backends import Crawl4aiBackend, FirecrawlBackend, ScrapeBackend, StaticHttpBackend
+from circuit import CircuitBreaker, SiteFailure, is_site_failure
+from budget import CREDITS_PER_CALL, CreditBudget
+from sitemap import SitemapDiscovery
+from snapshots import SourceSnapshots
+from scheduler import CrawlScheduler
+from admission import DiscoveryAdmission
+from backlog import DiscoveryBacklog
+from canonical import canonicalize_url
+from coalesce import SingleFlight
+from url_model import UrlScorer
+from templates import TemplateStats
+from kortinfo import KortinfoDataLayer
+from feeds import FeedDiscovery
+
+# Retry policy: permanent errors (404, 402, ...) fail fast, 429s honor Retry-After,
+# transient errors back off exponentially with jitter
+MAX_RETRIES = 3  # number of retries for rate-limited/transient failures
+RETRY_BASE_DELAY = 2  # seconds, doubled per attempt (+/-50% jitter)
+RETRY_MAX_DELAY = 60  # cap on a single backoff
+RETRY_BUDGET_SECONDS = 600  # total time the whole run may spend waiting on retries
 
 # Global discovery limits (safety measures)
-MAX_TOTAL_DISCOVERIES_PER_RUN = 200  # Hard cap on total URLs discovered per run
+MAX_TOTAL_DISCOVERIES_PER_RUN = 200  # Hard cap on total URLs admitted to analysis per run (fair share per source)
 MAX_URLS_PER_SOURCE = 25  # Hard cap per individual source (overrides type limits)
 
 # Load environment variables from env.local
 load_dotenv('env.local')
 
+# Firecrawl credit budget (0 = unlimited). When a budget is set, sources are
+# discovered in order of expected value (historical proposals per credit) and
+# work that no longer fits is deferred to the next run and listed in the events row.
+FIRECRAWL_RUN_CREDITS = int(os.environ.get("FIRECRAWL_RUN_CREDITS", "0"))
+FIRECRAWL_MONTHLY_CREDITS = int(os.environ.get("FIRECRAWL_MONTHLY_CREDITS", "0"))
+
+# Per-domain circuit breaker: after this many consecutive failures (site down,
+# timeouts, 5xx) the domain's remaining URLs fail fast with "circuit_open" for
+# the rest of the run. 0 disables it.
+CIRCUIT_BREAKER_THRESHOLD = int(os.environ.get("CIRCUIT_BREAKER_THRESHOLD", "3"))
+CIRCUIT_OPEN = "circuit_open"
+
+# Learned URL scoring (train_url_model.py): when url_model.json exists, discovered
+# URLs are admitted in model-score order instead of by the keyword heuristic, and
+# URLs scoring below URL_SCORE_THRESHOLD (0-1, 0 = keep all) are not scraped
+URL_MODEL_PATH = os.environ.get("URL_MODEL_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "url_model.json"))
+URL_SCORE_THRESHOLD = float(os.environ.get("URL_SCORE_THRESHOLD", "0"))
+
+# URL templates: processed URLs are grouped per domain into path templates
+# (/nyheder/job-*) with their proposal yield. Templates with TEMPLATE_MIN_SAMPLES
+# analysed URLs and no proposal are skipped before scraping, except for one
+# sample every TEMPLATE_RESAMPLE_DAYS.
+TEMPLATE_SKIP = os.environ.get("TEMPLATE_SKIP", "on") != "off"
+TEMPLATE_MIN_SAMPLES = int(os.environ.get("TEMPLATE_MIN_SAMPLES", "10"))
+TEMPLATE_RESAMPLE_DAYS = float(os.environ.get("TEMPLATE_RESAMPLE_DAYS", "14"))
+
+# Discovery backlog: URLs over the caps above (or deferred by the budget or an
+# open circuit) are queued locally and drained at the start of the next run,
+# before any credits go to fresh discovery. BACKLOG_SHEET mirrors queue/drain
+# events to a Sheets tab (append-only log; the local queue is authoritative).
+DISCOVERY_BACKLOG = os.environ.get("DISCOVERY_BACKLOG", "on") != "off"
+BACKLOG_MAX_AGE_DAYS = float(os.environ.get("BACKLOG_MAX_AGE_DAYS", "30"))
+BACKLOG_SHEET = os.environ.get("BACKLOG_SHEET", "")
+
 # Config
 FIRECRAWL_API_KEY = os.environ.get("FIRECRAWL_API_KEY")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
-# Type-specific discovery configuration
+# Rate limiting: one token bucket shared by all Firecrawl calls, sized by plan tier
+# (free = 15 req/min, hobby = 100, standard = 500, growth = 5000)
+FIRECRAWL_PLAN = os.environ.get("FIRECRAWL_PLAN", "free")
+
+# Phase 2 concurrency: each external service gets its own bounded worker pool and
+# rate limit, so OpenAI latency overlaps with scraping instead of adding to it.
+# ANALYSIS_MODE=sequential runs every stage inline (useful for debugging).
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "concurrent")
+FIRECRAWL_WORKERS = int(os.environ.get("FIRECRAWL_WORKERS", "2"))
+OPENAI_WORKERS = int(os.environ.get("OPENAI_WORKERS", "4"))
+SHEETS_WORKERS = int(os.environ.get("SHEETS_WORKERS", "2"))
+DISCOVERY_WORKERS = int(os.environ.get("DISCOVERY_WORKERS", "8"))  # Phase 1 sources discovered at once
+OPENAI_REQUESTS_PER_MINUTE = int(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", "500"))
+SHEETS_REQUESTS_PER_MINUTE = int(os.environ.get("SHEETS_REQUESTS_PER_MINUTE", "300"))
+
+# SCRAPE_MODE=batch submits Phase 2 URLs as Firecrawl batch-scrape jobs of
+# BATCH_SCRAPE_SIZE URLs and streams results into classification as they finish
+SCRAPE_MODE = os.environ.get("SCRAPE_MODE", "single")
+BATCH_SCRAPE_SIZE = int(os.environ.get("BATCH_SCRAPE_SIZE", "25"))
+BATCH_POLL_INTERVAL = 2  # seconds between batch status checks
+BATCH_TIMEOUT = 900  # seconds before a batch job's missing URLs are reported as failed
+
+# Preflight: pooled HEAD before paying for a scrape. Skips non-HTML,
+# oversized and redirected-to-seen URLs.
+PREFLIGHT_ENABLED = os.environ.get("PREFLIGHT", "on") != "off"
+PREFLIGHT_WORKERS = int(os.environ.get("PREFLIGHT_WORKERS", "8"))
+PREFLIGHT_MAX_BYTES = 5 * 1024 * 1024  # larger pages are not listings worth scraping
+
+# Per-host politeness for concurrent fetching: URLs are queued per domain and
+# dispatched round-robin, with a concurrency cap and minimum delay per host
+# (raised to the site's robots.txt Crawl-delay when RESPECT_ROBOTS is on)
+HOST_CONCURRENCY = int(os.environ.get("HOST_CONCURRENCY", "2"))
+HOST_DELAY = float(os.environ.get("HOST_DELAY", "1.0"))  # seconds between request starts per host
+RESPECT_ROBOTS = os.environ.get("RESPECT_ROBOTS", "on") != "off"
+
+# crawl4ai backend: one browser per run, shared by all sources; Phase 2 URLs are
+# batched through its memory-adaptive dispatcher with this many pages open
+CRAWL4AI_PAGE_CONCURRENCY = int(os.environ.get("CRAWL4AI_PAGE_CONCURRENCY", "4"))
+CRAWL4AI_MEMORY_THRESHOLD = float(os.environ.get("CRAWL4AI_MEMORY_THRESHOLD", "80"))  # % of system RAM
+
+# FIRECRAWL_FAKE=1 swaps in an offline stand-in for local testing (no credits used)
+FIRECRAWL_FAKE = os.environ.get("FIRECRAWL_FAKE") == "1"
+
+# Local state (scrape cache etc.) - persisted between GitHub Actions runs via actions/cache
+CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"))
+SCRAPE_CACHE_ENABLED = os.environ.get("SCRAPE_CACHE", "on") != "off"
+SCRAPE_CACHE_MAX_MB = int(os.environ.get("SCRAPE_CACHE_MAX_MB", "200"))
+
+# Sitemap discovery: map-type sources are first discovered from their sitemap.xml
+# (parsed locally, only URLs with a lastmod newer than the last run); map_url is
+# only called for sites without a usable sitemap
+SITEMAP_DISCOVERY = os.environ.get("SITEMAP_DISCOVERY", "on") != "off"
+
+# Source snapshots: a conditional GET on each source's landing page decides
+# whether it needs re-mapping at all; mapped sources only pass on URLs not in
+# their stored link set. Sources are re-mapped at least every SNAPSHOT_MAX_AGE_DAYS.
+SOURCE_SNAPSHOTS = os.environ.get("SOURCE_SNAPSHOTS", "on") != "off"
+SNAPSHOT_MAX_AGE_DAYS = float(os.environ.get("SNAPSHOT_MAX_AGE_DAYS", "7"))
+SNAPSHOT_SKIP_TYPES = ("kortinfo", "minimal")  # SPA shells never change; minimal sources are not mapped
+
+# Adaptive scan frequency: each source gets its own interval, halved after a
+# proposal and grown by half after an empty scan, within these bounds (days).
+# Only due sources are scanned; "scan_interval_days" in sources.json pins a source.
+ADAPTIVE_SCHEDULE = os.environ.get("ADAPTIVE_SCHEDULE", "on") != "off"
+SCHEDULE_MIN_DAYS = float(os.environ.get("SCHEDULE_MIN_DAYS", "1"))
+SCHEDULE_MAX_DAYS = float(os.environ.get("SCHEDULE_MAX_DAYS", "30"))
+
+# Kortinfo sources are discovered from the SPA's JSON data layer (plot ids and
+# statuses) instead of a JS-rendered Firecrawl scrape; only new plots and status
+# changes produce URLs. Sites without a findable endpoint fall back to the scrape.
+KORTINFO_DATA_LAYER = os.environ.get("KORTINFO_DATA_LAYER", "on") != "off"
+
+# news_feed sources are discovered from their RSS/Atom feed when they have one:
+# conditional GET, only items newer than the last run, and a free keyword check
+# on title/summary before anything is scraped or classified. Map is the fallback.
+FEED_DISCOVERY = os.environ.get("FEED_DISCOVERY", "on") != "off"
+
+# Type-specific discovery configuration. "backend" picks the scraping engine
+# ("firecrawl", "static" or "crawl4ai"); a source in sources.json may override it.
 DISCOVERY_CONFIG = {
     "dedicated_portal": {
         "limit": 20,  # Reduced from 100 - these are focused sites
         "keywords": "villagrunde storparceller erhvervsgrunde parcelhusgrunde",
-        "classify": False
+        "classify": False,
+        "backend": "firecrawl"
     },
     "kortinfo": {
         "limit": 15,  # Reduced from 100 - these are property-specific sites
         "keywords": "parcelhusgrunde boliggrunde erhvervsgrunde grund plot area",
-        "classify": False
+        "classify": False,
+        "backend": "firecrawl"
     },
     "news_feed": {
         "limit": 10,  # Reduced from 20 - news feeds change frequently
         "keywords": "grund salg bygge ejendom udbud bolig erhverv",  # More flexible keywords
-        "classify": True  # Use AI to filter irrelevant news
+        "classify": True,  # Use AI to filter irrelevant news
+        "backend": "firecrawl"
     },
     "municipality_subsection": {
         "limit": 8,   # Reduced from 50 - most municipalities have few active listings
         "keywords": "grund salg ejendom bygge bolig erhverv parcelhus villa storparcel udbud",  # More flexible keywords
-        "classify": False
+        "classify": False,
+        "backend": "static"  # Mostly server-rendered; falls back to Firecrawl for JS pages
     },
     "minimal": {
         "limit": 3,   # Reduced from 5 - these are basic scans
         "keywords": "grundsalg ejendomme",
-        "classify": False
+        "classify": False,
+        "backend": "firecrawl"
     }
 }
 
 # Init clients
-firecrawl = FirecrawlApp(api_key=FIRECRAWL_API_KEY) if FIRECRAWL_API_KEY else None
+if FIRECRAWL_FAKE:
+    firecrawl = FakeFirecrawlApp()
+else:
+    firecrawl = FirecrawlApp(api_key=FIRECRAWL_API_KEY) if FIRECRAWL_API_KEY else None
+batch_client = FirecrawlBatchClient(firecrawl) if firecrawl else None
 openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+firecrawl_limiter = RateLimiter.for_firecrawl_plan(FIRECRAWL_PLAN)
+openai_limiter = RateLimiter(OPENAI_REQUESTS_PER_MINUTE, name="openai")
+sheets_limiter = RateLimiter(SHEETS_REQUESTS_PER_MINUTE, name="sheets")
+scrape_cache = ScrapeCache(
+    os.path.join(CACHE_DIR, "scrape_cache.sqlite"),
+    max_bytes=SCRAPE_CACHE_MAX_MB * 1024 * 1024
+) if SCRAPE_CACHE_ENABLED else None
+preflight = Preflight(
+    max_bytes=PREFLIGHT_MAX_BYTES,
+    pool_size=PREFLIGHT_WORKERS
+) if PREFLIGHT_ENABLED else None
+robots_cache = RobotsCache() if RESPECT_ROBOTS else None
+sitemap_discovery = SitemapDiscovery(
+    os.path.join(CACHE_DIR, "sitemaps.json"),
+    pool_size=DISCOVERY_WORKERS
+) if SITEMAP_DISCOVERY else None
+source_snapshots = SourceSnapshots(
+    os.path.join(CACHE_DIR, "snapshots.json"),
+    max_age_days=SNAPSHOT_MAX_AGE_DAYS,
+    pool_size=DISCOVERY_WORKERS
+) if SOURCE_SNAPSHOTS else None
+crawl_scheduler = CrawlScheduler(
+    os.path.join(CACHE_DIR, "schedule.json"),
+    min_days=SCHEDULE_MIN_DAYS,
+    max_days=SCHEDULE_MAX_DAYS
+) if ADAPTIVE_SCHEDULE else None
+kortinfo_data = KortinfoDataLayer(
+    os.path.join(CACHE_DIR, "kortinfo.json"),
+    pool_size=DISCOVERY_WORKERS
+) if KORTINFO_DATA_LAYER else None
+feed_discovery = FeedDiscovery(
+    os.path.join(CACHE_DIR, "feeds.json"),
+    pool_size=DISCOVERY_WORKERS
+) if FEED_DISCOVERY else None
+url_templates = TemplateStats(
+    os.path.join(CACHE_DIR, "templates.json"),
+    min_samples=TEMPLATE_MIN_SAMPLES,
+    resample_days=TEMPLATE_RESAMPLE_DAYS
+) if TEMPLATE_SKIP else None
+discovery_backlog = DiscoveryBacklog(
+    os.path.join(CACHE_DIR, "backlog.json"),
+    max_age_days=BACKLOG_MAX_AGE_DAYS
+) if DISCOVERY_BACKLOG else None
+credit_budget = CreditBudget(
+    os.path.join(CACHE_DIR, "budget.json"),
+    run_budget=FIRECRAWL_RUN_CREDITS,
+    month_budget=FIRECRAWL_MONTHLY_CREDITS
+)
+circuit_breaker = CircuitBreaker(
+    os.path.join(CACHE_DIR, "circuit.json"),
+    threshold=CIRCUIT_BREAKER_THRESHOLD
+) if CIRCUIT_BREAKER_THRESHOLD > 0 else None
+retry_policy = RetryPolicy(
+    max_retries=MAX_RETRIES,
+    base_delay=RETRY_BASE_DELAY,
+    max_delay=RETRY_MAX_DELAY,
+    budget_seconds=RETRY_BUDGET_SECONDS
+)
+
+
+backends = {
+    "firecrawl": FirecrawlBackend(firecrawl, firecrawl_limiter),
+    "crawl4ai": Crawl4aiBackend(CRAWL4AI_PAGE_CONCURRENCY, CRAWL4AI_MEMORY_THRESHOLD, HOST_DELAY),
+}
+backends["static"] = StaticHttpBackend(backends["firecrawl"], pool_size=FIRECRAWL_WORKERS * 4)
+
+_backend_warnings = set()
+url_scorer = UrlScorer.load(URL_MODEL_PATH)
+in_flight = SingleFlight()  # Concurrent backend calls for the same URL share one fetch
+
+
+def get_backend(source: Optional[dict] = None) -> ScrapeBackend:
+    """Pick the scraping backend for a source (sources.json override, then type config)."""
+    source = source or {}
+    config = DISCOVERY_CONFIG.get(source.get("type"), DISCOVERY_CONFIG["municipality_subsection"])
+    name = source.get("backend") or config.get("backend", "firecrawl")
+    backend = backends.get(name)
+    if backend is None or not backend.available():
+        if name != "firecrawl" and name not in _backend_warnings:
+            _backend_warnings.add(name)
+            print(f"  Warning: Backend '{name}' unavailable, falling back to Firecrawl")
+        return backends["firecrawl"]
+    return backend
+
+
+def backend_call(backend: ScrapeBackend, method: str, url: str, params: dict):
+    """
+    Call backend.scrape/backend.map under the shared retry policy. Callers that
+    arrive while the same call is in flight wait for it instead of fetching again;
+    their scrape results are marked "coalesced" (free for the credit budget).
+    """
+    key = (backend.name, method, url, json.dumps(params, sort_keys=True))
+    result, shared = in_flight.do(
+        key, lambda: retry_policy.call(lambda: getattr(backend, method)(url, params), description=url)
+    )
+    if shared and isinstance(result, dict):
+        result = {**result, "coalesced": True}
+    return result
+
+
+def discovery_credits(source: dict, backend: ScrapeBackend) -> tuple[str, int]:
+    """Firecrawl call kind and credits discover_new_urls will spend on a source."""
+    source_type = source.get("type", "municipality_subsection")
+    if source_type == "minimal":
+        return "map", 0
+    kind = "scrape" if source_type == "kortinfo" else "map"
+    if not (backend.available() if kind == "scrape" else backend.map_available()):
+        return kind, 0
+    return kind, CREDITS_PER_CALL.get(backend.name, 0)
+
+
+def scrape_was_free(result: Optional[dict], error: Optional[str]) -> bool:
+    """True if a scrape never reached Firecrawl (cache hit, static page, coalesced, open circuit)."""
+    if error:
+        return error == CIRCUIT_OPEN
+    metadata = (result or {}).get("metadata", {}) or {}
+    if (result or {}).get("from_cache") or (result or {}).get("coalesced"):
+        return True
+    return metadata.get("backend") == "static"
+
+
+def circuit_allows(url: str) -> bool:
+    return circuit_breaker is None or circuit_breaker.allow(url)
+
+
+def record_host_outcome(url: str, error=None):
+    """
+    Feed the circuit breaker. Only failures of the target site itself count
+    against its domain (is_site_failure); a 404 still means the site is up, and
+    Firecrawl or local errors leave the domain's record untouched.
+    """
+    if circuit_breaker is None:
+        return
+    if error is None:
+        circuit_breaker.record_success(url)
+    elif is_site_failure(url, error):
+        circuit_breaker.record_failure(url)
 
 
-def scrape_with_retry(url: str, params: dict = None) -> tuple[Optional[dict], Optional[str]]:
+def scrape_with_retry(url: str, params: dict = None, source_type: str = None,
+                      backend: Optional[ScrapeBackend] = None, use_cache: bool = True) -> tuple[Optional[dict], Optional[str]]:
     """
-    Scrape URL with retry logic for transient failures.
+    Scrape URL, retrying only rate-limited and transient failures.
+    Fresh results from the local scrape cache are returned without a backend call
+    (use_cache=False when the caller has already looked there).
     Returns: (result_dict, error_message) - one will be None
     """
-    if not firecrawl:
-        return None, "Firecrawl not initialized"
+    params = params or {"formats": ["markdown"]}
+    backend = backend or backends["firecrawl"]
+
+    if scrape_cache and use_cache and not needs_refresh(url):
+        cached = scrape_cache.get(url, source_type, params.get("formats"))
+        if cached:
+            return cached, None
 
+    if not backend.available():
+        return None, backend.unavailable_reason
+    if not circuit_allows(url):
+        return None, CIRCUIT_OPEN
+
+    try:
+        result = backend_call(backend, "scrape", url, params)
+    except Exception as e:
+        record_host_outcome(url, e)
+        return None, str(e)
+
+    return check_scrape_result(url, result, source_type)
+
+
+def check_scrape_result(url: str, result: Optional[dict], source_type: str = None) -> tuple[Optional[dict], Optional[str]]:
+    """
+    Turn target-site errors reported inside a successful Firecrawl scrape into
+    failures, and cache everything else.
+    Returns: (result_dict, error_message) - one will be None
+    """
+    metadata = (result or {}).get("metadata", {}) or {}
+    status_code = metadata.get("statusCode")
+    if isinstance(status_code, int) and status_code >= 500:
+        record_host_outcome(url, SiteFailure(f"Page returned HTTP {status_code}"))
+    elif not metadata.get("error"):
+        record_host_outcome(url)
+    # Firecrawl reports target-site errors (e.g. a 404 page) as a successful scrape
+    if status_code in PERMANENT_STATUS_CODES:
+        return None, f"Page returned HTTP {status_code}"
+    if metadata.get("error"):
+        return None, metadata["error"]
+    if scrape_cache and result:
+        scrape_cache.put(url, result, source_type)
+    return result, None
+
+
+def batch_scrape(urls: List[str], source_types: dict, params: dict = None,
+                 backend: Optional[ScrapeBackend] = None) -> Iterator[tuple[str, Optional[dict], Optional[str]]]:
+    """
+    Scrape URLs as one batch, yielding (url, result, error) as each completes.
+    Backends with scrape_many (crawl4ai) use it; otherwise a Firecrawl batch job is started.
+    source_types maps url -> source type for caching.
+    """
     params = params or {"formats": ["markdown"]}
-    last_error = None
+    if backend is not None and hasattr(backend, "scrape_many"):
+        for url, result, error in backend.scrape_many(urls, params):
+            if error:
+                record_host_outcome(url, error)
+                yield url, None, error
+            else:
+                yield (url, *check_scrape_result(url, result, source_types.get(url)))
+        return
 
-    for attempt in range(MAX_RETRIES + 1):
-        try:
-            time.sleep(RATE_LIMIT_DELAY)
-            result = firecrawl.scrape_url(url, params=params)
-            return result, None
-        except Exception as e:
-            last_error = str(e)
-            if attempt < MAX_RETRIES:
-                print(f"  Retry {attempt + 1}/{MAX_RETRIES} for {url}...")
-                time.sleep(RETRY_DELAY)
+    if not batch_client:
+        for url in urls:
+            yield url, None, "Firecrawl not initialized"
+        return
 
-    return None, last_error
+    def start():
+        firecrawl_limiter.acquire()
+        return batch_client.start(urls, params)
+
+    try:
+        job_id = retry_policy.call(start, description=f"batch of {len(urls)} URLs")
+    except Exception as e:
+        for url in urls:
+            yield url, None, f"Batch scrape failed to start: {e}"
+        return
+
+    print(f"  Batch scrape {job_id} started for {len(urls)} URLs", flush=True)
+    for url, result, error in batch_client.iter_results(job_id, urls, BATCH_POLL_INTERVAL, BATCH_TIMEOUT, retry_policy.call):
+        if error:
+            yield url, None, error
+        else:
+            yield (url, *check_scrape_result(url, result, source_types.get(url)))
 
 
 def log_failure(timestamp: str, url: str, source_id: str, failure_type: str, error_message: str):
     """Log a failure to the failures tab in Google Sheets."""
     try:
+        sheets_limiter.acquire()
         append_row("failures", [timestamp, url, source_id, failure_type, error_message])
     except Exception as e:
         print(f"  Warning: Could not log failure to sheets: {e}")
@@ -94,6 +446,7 @@ def log_failure(timestamp: str, url: str, source_id: str, failure_type: str, err
 def append_row_safe(sheet_name: str, values: list, stats: Optional[dict] = None, context: str = "") -> bool:
     """Append to Google Sheets but swallow failures so monitoring can continue."""
     try:
+        sheets_limiter.acquire()
         append_row(sheet_name, values)
         return True
     except Exception as e:
@@ -108,14 +461,19 @@ def append_row_safe(sheet_name: str, values: list, stats: Optional[dict] = None,
         return False
 
 
+def mirror_backlog(action: str, source_id: str, url: str, timestamp: str, stats: Optional[dict] = None):
+    """Log a backlog queue/drain event to BACKLOG_SHEET, if configured."""
+    if BACKLOG_SHEET:
+        append_row_safe(BACKLOG_SHEET, [timestamp, action, source_id, url], stats, context="backlog")
+
 def get_existing_urls() -> set:
     """Fetch already processed URLs from the 'seen_urls' sheet."""
     try:
         rows = get_rows("seen_urls")
         if not rows:
             return set()
-        # Assume first column is the URL
-        return {row[0] for row in rows if row}
+        # Assume first column is the URL; older rows may predate canonicalization
+        return {canonicalize_url(row[0]) for row in rows if row}
     except Exception as e:
         print(f"Warning: Could not load seen_urls: {e}")
         return set()
@@ -135,7 +493,10 @@ def get_sources_from_json() -> List[dict]:
                     "name": s.get("name", ""),
                     "url": s.get("url", ""),
                     "type": s.get("type", "municipality_subsection"),
-                    "region": s.get("region", "")
+                    "region": s.get("region", ""),
+                    "backend": s.get("backend"),
+                    "scan_interval_days": s.get("scan_interval_days"),
+                    "data_url": s.get("data_url")
                 })
         return sources
     except Exception as e:
@@ -216,6 +577,7 @@ def classify_relevance(url: str, content: str) -> dict:
         return result
 
     try:
+        openai_limiter.acquire()
         response = openai_client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
@@ -250,20 +612,40 @@ def is_property_related(url: str, content: str) -> bool:
     result = classify_relevance(url, content)
     return result.get("is_relevant", False)
 
-def discover_kortinfo_urls(base_url: str, seen_urls: set) -> tuple[List[str], Optional[str]]:
-    """Extract property URLs from kortinfo sites via scrape (they're JavaScript SPAs)."""
-    if not firecrawl:
-        return [], "Firecrawl not initialized"
+def needs_refresh(url: str) -> bool:
+    """True for a seen kortinfo landing page whose link-less plots changed in this run."""
+    return kortinfo_data is not None and canonicalize_url(url) in kortinfo_data.refresh
 
-    print(f"Scraping kortinfo site {base_url}...", flush=True)
+def filter_new_urls(urls: Iterable[str], seen_urls: set) -> List[str]:
+    """
+    Drop PDFs and seen URLs, keeping the first of each page's URLs. URLs are
+    compared in canonical form but returned as found, for fetching.
+    """
+    new_urls = {}
+    for url in urls:
+        key = canonicalize_url(url)
+        if key not in new_urls and (key not in seen_urls or needs_refresh(key)) and not key.lower().endswith('.pdf'):
+            new_urls[key] = url
+    return list(new_urls.values())
+
+def discover_kortinfo_urls(base_url: str, seen_urls: set, backend: Optional[ScrapeBackend] = None) -> tuple[List[str], Optional[str]]:
+    """Extract property URLs from kortinfo sites via scrape (they're JavaScript SPAs)."""
+    backend = backend or backends["firecrawl"]
+    if not backend.available():
+        return [], backend.unavailable_reason
+    if not circuit_allows(base_url):
+        print(f"Circuit open for {base_url}, skipping discovery.")
+        return [], CIRCUIT_OPEN
+
+    print(f"Scraping kortinfo site {base_url} ({backend.name})...", flush=True)
     try:
-        time.sleep(RATE_LIMIT_DELAY)  # Rate limit
-        result = firecrawl.scrape_url(base_url, params={
+        result = backend_call(backend, "scrape", base_url, {
             "formats": ["markdown", "links"]
         })
+        record_host_outcome(base_url)
 
-        # Get links from the scrape result
-        links = result.get("links", [])
+        # Get unseen links from the scrape result
+        links = filter_new_urls(result.get("links", []), seen_urls)
 
         # Filter to property-related URLs
         property_patterns = [
@@ -274,8 +656,6 @@ def discover_kortinfo_urls(base_url: str, seen_urls: set) -> tuple[List[str], Op
         new_urls = [
             url for url in links
             if any(p.lower() in url.lower() for p in property_patterns)
-            and url not in seen_urls
-            and not url.lower().endswith('.pdf')
         ]
 
         # If no property URLs found via patterns, include all kortinfo subpages
@@ -284,67 +664,105 @@ def discover_kortinfo_urls(base_url: str, seen_urls: set) -> tuple[List[str], Op
             new_urls = [
                 url for url in links
                 if base_domain in url
-                and url != base_url
-                and url not in seen_urls
-                and not url.lower().endswith('.pdf')
+                and canonicalize_url(url) != canonicalize_url(base_url)
             ]
 
         print(f"Found {len(new_urls)} property URLs from kortinfo scrape.")
         return new_urls, None
     except Exception as e:
         print(f"Kortinfo scrape failed for {base_url}: {e}")
+        record_host_outcome(base_url, e)
         return [], str(e)
 
 def discover_new_urls(source: dict, seen_urls: set) -> tuple[List[str], Optional[str]]:
-    """Use Firecrawl to find new potential property listing URLs with type-specific config."""
-    if not firecrawl:
-        print("Firecrawl not initialized, skipping discovery.")
-        return [], "Firecrawl not initialized"
+    """Find new potential property listing URLs with type-specific config and backend."""
+    backend = get_backend(source)
+    if not backend.available():
+        print(f"{backend.unavailable_reason}, skipping discovery.")
+        return [], backend.unavailable_reason
 
     base_url = source.get("url", "")
     source_type = source.get("type", "municipality_subsection")
     config = DISCOVERY_CONFIG.get(source_type, DISCOVERY_CONFIG["municipality_subsection"])
 
-    # KORTINFO: Use scrape instead of map (JavaScript SPA)
+    # KORTINFO: Read the plot data layer, or scrape instead of map (JavaScript SPA)
     if source_type == "kortinfo":
-        return discover_kortinfo_urls(base_url, seen_urls)
+        if kortinfo_data:
+            print(f"Reading kortinfo data layer for {base_url}...", flush=True)
+            discovered = kortinfo_data.discover(source)
+            if discovered is not None:
+                new_urls = filter_new_urls(discovered, seen_urls)
+                print(f"Found {len(new_urls)} new URLs from {len(discovered)} new/changed plots.")
+                return new_urls, None
+            print("  No kortinfo data layer found, falling back to scrape")
+        return discover_kortinfo_urls(base_url, seen_urls, backend)
 
     # MINIMAL: Just return the base URL for direct scraping
     if source_type == "minimal":
         print(f"Minimal site {base_url} - returning base URL only")
-        return ([base_url] if base_url not in seen_urls else []), None
-
-    # OTHER TYPES: Use map_url
-    print(f"Mapping {base_url} (type: {source_type}, limit: {config['limit']})...", flush=True)
+        return ([base_url] if canonicalize_url(base_url) not in seen_urls else []), None
+
+    # OTHER TYPES: Use the feed (news) or sitemap if the site has one, map_url otherwise
+    if not circuit_allows(base_url):
+        print(f"Circuit open for {base_url}, skipping discovery.")
+        return [], CIRCUIT_OPEN
+    if feed_discovery and source_type == "news_feed":
+        print(f"Polling feed for {base_url} (limit: {config['limit']})...", flush=True)
+        items = feed_discovery.discover(source, config["keywords"], config["limit"], seen_urls)
+        if items is not None:
+            new_urls = filter_new_urls((item["url"] for item in items), seen_urls)
+            print(f"Found {len(new_urls)} new URLs in feed.")
+            return new_urls, None
+        print("  No feed found, falling back")
+    if sitemap_discovery:
+        print(f"Reading sitemap for {base_url} (type: {source_type}, limit: {config['limit']})...", flush=True)
+        discovered = sitemap_discovery.discover(source, config["keywords"], config["limit"], seen_urls)
+        if discovered is not None:
+            new_urls = filter_new_urls(discovered, seen_urls)
+            print(f"Found {len(new_urls)} new URLs in sitemap.")
+            return new_urls, None
+        print("  No usable sitemap, falling back to map")
+    if not backend.map_available():
+        print(f"{backend.unavailable_reason}, skipping map.")
+        return [], backend.unavailable_reason
+    print(f"Mapping {base_url} (type: {source_type}, limit: {config['limit']}, backend: {backend.name})...", flush=True)
     try:
-        time.sleep(RATE_LIMIT_DELAY)  # Rate limit
-        map_result = firecrawl.map_url(base_url, params={
+        discovered = backend_call(backend, "map", base_url, {
             "search": config["keywords"],
             "limit": config["limit"]
         })
-
-        # map_url returns a list directly
-        discovered = map_result if isinstance(map_result, list) else map_result.get("links", [])
+        record_host_outcome(base_url)
         print(f"  Raw discovery: {len(discovered)} URLs found")
 
-        # Filter out PDFs and already seen URLs
-        new_urls = [
-            url for url in discovered
-            if url not in seen_urls and not url.lower().endswith('.pdf')
-        ]
+        # Filter out PDFs and already seen URLs (compared in canonical form)
+        new_urls = filter_new_urls(discovered, seen_urls)
         print(f"  After filtering: {len(new_urls)} new URLs")
 
-        # Apply safety limits
-        if len(new_urls) > MAX_URLS_PER_SOURCE:
-            print(f"  Limiting to {MAX_URLS_PER_SOURCE} URLs (found {len(new_urls)})")
-            new_urls = new_urls[:MAX_URLS_PER_SOURCE]
-
         print(f"Found {len(new_urls)} new URLs out of {len(discovered)} mapped.")
         return new_urls, None
     except Exception as e:
-        print(f"Firecrawl map failed for {base_url}: {e}")
+        print(f"Map failed for {base_url} ({backend.name}): {e}")
+        record_host_outcome(base_url, e)
         return [], str(e)
 
+def discover_source(source: dict, seen_urls: set) -> tuple[Optional[List[str]], Optional[str]]:
+    """
+    Phase 1 work for one source, run in the discovery pool.
+    Returns (new_urls, error); new_urls is None when the source's landing page
+    is unchanged since its last mapping and discovery was skipped.
+    """
+    snapshotted = source_snapshots and source.get("type") not in SNAPSHOT_SKIP_TYPES
+    if snapshotted:
+        changed, reason = source_snapshots.check(source)
+        if not changed:
+            print(f"⏭️ {source.get('municipality', '')}: landing page unchanged ({reason}), skipping discovery")
+            return None, None
+
+    new_urls, discovery_error = discover_new_urls(source, seen_urls)
+    if snapshotted and not discovery_error:
+        new_urls = source_snapshots.diff(source, new_urls)
+    return new_urls, discovery_error
+
 EXTRACTION_PROMPT = """Analyze this Danish municipality page. Output JSON:
 {
   "is_property_listing": boolean,  // Is this about property/land for sale or development?
@@ -457,20 +875,19 @@ def extract_property_data(url: str, pre_scraped_content: str = None) -> Optional
 
     # Use pre-scraped content if available (avoids double scraping)
     content = pre_scraped_content
-    if not content and firecrawl:
+    if not content:
         print(f"Scraping and extracting from {url}...", flush=True)
-        try:
-            time.sleep(RATE_LIMIT_DELAY)  # Rate limit
-            scrape_result = firecrawl.scrape_url(url, params={"formats": ["markdown"]})
-            content = scrape_result.get("markdown", "")
-        except Exception as e:
-            print(f"Scrape failed for {url}: {e}")
+        scrape_result, scrape_error = scrape_with_retry(url, {"formats": ["markdown"]})
+        if scrape_error:
+            print(f"Scrape failed for {url}: {scrape_error}")
             return None
+        content = scrape_result.get("markdown", "")
 
     if not content:
         return None
 
     try:
+        openai_limiter.acquire()
         response = openai_client.chat.completions.create(
             model="gpt-4o",
             messages=[
@@ -487,6 +904,311 @@ def extract_property_data(url: str, pre_scraped_content: str = None) -> Optional
         print(f"Extraction failed for {url}: {e}")
         return None
 
+class _InlineExecutor:
+    """Executor stand-in that runs work immediately (ANALYSIS_MODE=sequential)."""
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait: bool = True):
+        pass
+
+
+class AnalysisPipeline:
+    """
+    Phase 2 preflight -> scrape -> classify/extract -> Sheets pipeline.
+
+    Each stage runs in its own bounded pool (PREFLIGHT_WORKERS, FIRECRAWL_WORKERS,
+    OPENAI_WORKERS, SHEETS_WORKERS) and every call inside a stage goes through that service's
+    shared rate limiter. Stats are updated under a lock; proposals are returned
+    in submission order so notifications stay deterministic.
+    """
+
+    def __init__(self, timestamp: str, stats: dict, seen_urls: set):
+        self.timestamp = timestamp
+        self.stats = stats
+        self.seen_urls = seen_urls
+        self.lock = threading.Lock()
+        self.proposals = []  # List of (index, proposal) tuples
+        self.futures = []
+        self.submitted = 0
+        self.sources_by_url = {}  # Canonical URL -> every source that discovered it in this run
+        self.batches = {}  # Backend name -> pending (index, source, url) for batched scraping
+
+        if ANALYSIS_MODE == "sequential":
+            self.preflight_pool = self.scrape_pool = self.openai_pool = self.sheets_pool = _InlineExecutor()
+            self.preflight_hosts = self.scrape_hosts = None
+        else:
+            self.preflight_pool = ThreadPoolExecutor(PREFLIGHT_WORKERS, thread_name_prefix="preflight")
+            self.scrape_pool = ThreadPoolExecutor(FIRECRAWL_WORKERS, thread_name_prefix="firecrawl")
+            self.openai_pool = ThreadPoolExecutor(OPENAI_WORKERS, thread_name_prefix="openai")
+            self.sheets_pool = ThreadPoolExecutor(SHEETS_WORKERS, thread_name_prefix="sheets")
+            # Stages that hit municipal servers go through per-host politeness queues
+            self.preflight_hosts = HostScheduler(
+                self.preflight_pool, PREFLIGHT_WORKERS, HOST_CONCURRENCY, HOST_DELAY, robots_cache
+            )
+            self.scrape_hosts = HostScheduler(
+                self.scrape_pool, FIRECRAWL_WORKERS, HOST_CONCURRENCY, HOST_DELAY, robots_cache
+            )
+
+    def submit(self, source: dict, url: str):
+        """
+        Queue one discovered URL for analysis. A URL already queued in this run
+        is only recorded as also found by `source`; seen URLs are skipped unless
+        they need a refresh.
+        """
+        key = canonicalize_url(url)
+        refresh = needs_refresh(key)
+        with self.lock:
+            if key in self.sources_by_url:
+                if source not in self.sources_by_url[key]:
+                    self.sources_by_url[key].append(source)
+                return
+            if key in self.seen_urls and not refresh:
+                return
+            self.sources_by_url[key] = [source]
+            index = self.submitted
+            self.submitted += 1
+
+        # A refreshed landing page is seen on purpose; preflight would skip it as redirect_to_seen
+        if preflight and circuit_allows(url) and not refresh:
+            self._schedule(self.preflight_hosts, self.preflight_pool, url, self._preflight_stage, index, source)
+        else:
+            self._queue_scrape(index, source, url)
+
+    def _schedule(self, hosts: Optional[HostScheduler], pool, url: str, fn, index: int, source: dict, *args):
+        if hosts:
+            hosts.submit(url, self._guarded, fn, index, source, url, *args)
+        else:
+            self._track(pool.submit(self._guarded, fn, index, source, url, *args))
+
+    def _guarded(self, fn, index: int, source: dict, url: str, *args):
+        """Run a per-URL stage; a crash is recorded as a scrape failure instead of losing the URL."""
+        try:
+            fn(index, source, url, *args)
+        except Exception as e:
+            print(f"  ❌ {fn.__name__} crashed for {url}: {e}", flush=True)
+            # Not marked as seen, so the URL is queued in the backlog for a later run
+            self._record_failure("scrape_failed", url, source.get("municipality", "unknown"), f"{fn.__name__} crashed: {e}")
+
+    def _preflight_stage(self, index: int, source: dict, url: str):
+        should_scrape, reason, final_url = preflight.check(url, self.seen_urls)
+        if should_scrape:
+            self._queue_scrape(index, source, url)
+            return
+
+        source_id = source.get("municipality", "unknown")
+        print(f"  ⏭️ Preflight skip ({reason}): {url}", flush=True)
+        with self.lock:
+            self.stats["preflight_skipped"].append({"url": url, "source_id": source_id, "reason": reason})
+        self._mark_seen(url, source_id)
+
+    def _queue_scrape(self, index: int, source: dict, url: str):
+        source_id = source.get("municipality", "unknown")
+        cached = scrape_cache.get(url, source.get("type")) if scrape_cache and not needs_refresh(url) else None
+        allowed = circuit_allows(url)
+        backend = get_backend(source)
+        # A static backend without its Firecrawl fallback never spends credits
+        credits = CREDITS_PER_CALL.get(backend.name, 0) if allowed and not cached and backend.map_available() else 0
+        if not credit_budget.reserve(source_id, "scrape", credits):
+            # Not marked as seen, so the URL is rediscovered next run
+            print(f"  💳 Budget exhausted, deferring: {url}", flush=True)
+            credit_budget.defer_url(source_id)
+            with self.lock:
+                self.stats["budget_deferred"].append({"url": url, "source_id": source_id})
+            return
+        self._count("urls_attempted")
+
+        # Cached pages need neither Firecrawl nor a politeness slot
+        if cached:
+            self._track(self.scrape_pool.submit(self._handle_scrape, index, source, url, cached, None))
+            return
+        if not allowed:
+            self._handle_scrape(index, source, url, None, CIRCUIT_OPEN)
+            return
+
+        # Firecrawl batches only in SCRAPE_MODE=batch; crawl4ai always batches into its browser pool
+        batched = hasattr(backend, "scrape_many") or (SCRAPE_MODE == "batch" and backend.name == "firecrawl")
+        if not batched:
+            self._schedule(self.scrape_hosts, self.scrape_pool, url, self._scrape_stage, index, source)
+            return
+
+        with self.lock:
+            batch = self.batches.setdefault(backend.name, [])
+            batch.append((index, source, url))
+            full = len(batch) >= BATCH_SCRAPE_SIZE
+        if full:
+            self._flush_batch(backend.name)
+
+    def join(self) -> List[dict]:
+        """Wait for all stages to drain and return proposals for Slack."""
+        # Upstream stages must drain first because they submit downstream work
+        if self.preflight_hosts:
+            self.preflight_hosts.wait()
+        self.preflight_pool.shutdown(wait=True)
+        self._flush_batch()
+        if self.scrape_hosts:
+            self.scrape_hosts.wait()
+        self.scrape_pool.shutdown(wait=True)
+        self.openai_pool.shutdown(wait=True)
+        self.sheets_pool.shutdown(wait=True)
+        for future in self.futures:
+            error = future.exception()
+            if error:
+                print(f"  Warning: Analysis worker crashed: {error}")
+        return [proposal for _, proposal in sorted(self.proposals, key=lambda p: p[0])]
+
+    def _track(self, future: Future):
+        with self.lock:
+            self.futures.append(future)
+
+    def _count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.stats[key] += amount
+
+    def _record_failure(self, key: str, url: str, source_id: str, error: str):
+        with self.lock:
+            self.stats[key].append({"url": url, "source_id": source_id, "error": error})
+        self._track(self.sheets_pool.submit(log_failure, self.timestamp, url, source_id, key, error))
+
+    def _write(self, sheet_name: str, row: list, source_id: str):
+        self._track(self.sheets_pool.submit(append_row_safe, sheet_name, row, self.stats, source_id))
+
+    def _mark_seen(self, url: str, source_id: str):
+        key = canonicalize_url(url)
+        self._write("seen_urls", [key, self.timestamp], source_id)
+        with self.lock:
+            self.seen_urls.add(key)
+
+    def _flush_batch(self, backend_name: Optional[str] = None):
+        with self.lock:
+            names = [backend_name] if backend_name else list(self.batches)
+            flushed = [(name, self.batches.pop(name, [])) for name in names]
+        for name, batch in flushed:
+            if batch:
+                self._track(self.scrape_pool.submit(self._batch_stage, name, batch))
+
+    def _batch_stage(self, backend_name: str, batch: list):
+        by_url = {}  # The same URL may have been submitted by more than one source
+        for index, source, url in batch:
+            by_url.setdefault(url, []).append((index, source))
+        source_types = {url: entries[0][1].get("type") for url, entries in by_url.items()}
+        try:
+            for url, scrape_result, scrape_error in batch_scrape(list(by_url), source_types, backend=backends[backend_name]):
+                for index, source in by_url.pop(url, []):
+                    self._handle_scrape(index, source, url, scrape_result, scrape_error)
+        except Exception as e:
+            # Every URL still waiting is recorded as failed instead of vanishing
+            for url, entries in by_url.items():
+                for index, source in entries:
+                    self._handle_scrape(index, source, url, None, f"Batch scrape failed: {e}")
+
+    def _scrape_stage(self, index: int, source: dict, url: str):
+        # Scrape content with retry logic
+        backend = get_backend(source)
+        # _queue_scrape already missed the cache for this URL
+        scrape_result, scrape_error = scrape_with_retry(url, {"formats": ["markdown"]}, source.get("type"), backend, use_cache=False)
+        if scrape_was_free(scrape_result, scrape_error):
+            credit_budget.refund(source.get("municipality", "unknown"), "scrape", CREDITS_PER_CALL.get(backend.name, 0))
+        self._handle_scrape(index, source, url, scrape_result, scrape_error)
+
+    def _handle_scrape(self, index: int, source: dict, url: str, scrape_result: Optional[dict], scrape_error: Optional[str]):
+        source_id = source.get("municipality", "unknown")
+
+        if scrape_error:
+            print(f"  ❌ Scrape FAILED for {url}: {scrape_error}", flush=True)
+            self._record_failure("scrape_failed", url, source_id, scrape_error)
+            # Still mark as seen to avoid re-processing - unless the site was down,
+            # in which case the URL is picked up again once the circuit closes
+            if scrape_error != CIRCUIT_OPEN:
+                self._mark_seen(url, source_id)
+            return
+
+        self._count("scrape_success")
+        content = scrape_result.get("markdown", "") if scrape_result else ""
+        self._track(self.openai_pool.submit(self._analysis_stage, index, source, url, content))
+
+    def _analysis_stage(self, index: int, source: dict, url: str, content: str):
+        source_id = source.get("municipality", "unknown")
+
+        # Classify relevance (loose filter)
+        try:
+            classification = classify_relevance(url, content)
+            self._count("classification_success")
+        except Exception as e:
+            print(f"  ❌ Classification FAILED for {url}: {e}", flush=True)
+            self._record_failure("classification_failed", url, source_id, str(e))
+            # Still mark as seen
+            self._mark_seen(url, source_id)
+            return
+
+        if not classification.get("is_relevant", False):
+            print(f"  ⏭️ Skipping (not relevant): {url} - {classification.get('reason', '')}", flush=True)
+            self._count("skipped_irrelevant")
+            if url_templates is not None:
+                url_templates.record(url, False)
+            # Mark as seen to avoid re-processing
+            self._mark_seen(url, source_id)
+            return
+
+        print(f"  ✓ Relevant ({classification.get('category', 'unknown')}): {url}", flush=True)
+
+        # Extract structured data (reuse scraped content)
+        try:
+            data = extract_property_data(url, pre_scraped_content=content)
+        except Exception as e:
+            print(f"  ❌ Extraction FAILED for {url}: {e}", flush=True)
+            self._record_failure("extraction_failed", url, source_id, str(e))
+            self._mark_seen(url, source_id)
+            return
+
+        if url_templates is not None:
+            url_templates.record(url, bool(data))
+        if data:
+            self._count("extraction_success")
+            self._count("proposals_created")
+            # Every source that found the listing gets credit for it
+            with self.lock:
+                contributors = list(self.sources_by_url.get(canonicalize_url(url), [source]))
+            for contributor in contributors:
+                credit_budget.record_proposal(contributor.get("municipality", "unknown"))
+                if crawl_scheduler:
+                    crawl_scheduler.record_proposal(contributor.get("municipality", ""))
+
+            # Simplified proposals row: timestamp, municipality, title, url, confidence, summary, published_date
+            row = [
+                self.timestamp,
+                source.get("municipality", ""),
+                data.get("title", ""),
+                url,
+                data.get("confidence", 0),
+                data.get("summary", ""),
+                data.get("published_date", "")
+            ]
+            self._write("proposals", row, source_id)
+
+            # Collect for Slack notification
+            with self.lock:
+                self.proposals.append((index, {
+                    "municipality": source.get("name", source.get("municipality", "")),
+                    "title": data.get("title", "Untitled"),
+                    "url": url,
+                    "confidence": data.get("confidence", 0),
+                    "published_date": data.get("published_date", "")
+                }))
+        else:
+            # Extraction returned None (failed internally)
+            self._record_failure("extraction_failed", url, source_id, "Extraction returned None")
+
+        # Mark as seen
+        self._mark_seen(url, source_id)
+
+
 def main():
     timestamp = datetime.now(timezone.utc).isoformat()
     print(f"Starting monitor run at {timestamp}")
@@ -504,13 +1226,26 @@ def main():
         "extraction_success": 0,
         "extraction_failed": [],
         "proposals_created": 0,
+        "duplicate_discoveries": 0,  # URLs found by more than one source (analysed once)
         "skipped_irrelevant": 0,
+        "preflight_skipped": [],   # List of {"url": ..., "source_id": ..., "reason": ...}
+        "template_skipped": [],    # List of {"url": ..., "source_id": ...} in zero-yield URL templates
+        "url_score_skipped": [],   # List of {"url": ..., "source_id": ..., "score": ...} below URL_SCORE_THRESHOLD
+        "budget_deferred": [],     # List of {"url": ..., "source_id": ...} left for the next run
         "sheet_failed": [],        # List of {"sheet": ..., "context": ..., "error": ...}
     }
 
     # 1. Load context
     sources = get_sources()
     seen_urls = get_existing_urls()
+    if url_templates is not None and not len(url_templates):
+        # First run with template mining: learn the templates from the sheet history
+        try:
+            proposal_urls = {canonicalize_url(row[3]) for row in get_rows("proposals") if len(row) > 3 and row[3]}
+            url_templates.seed(seen_urls, proposal_urls)
+            print(f"Seeded {len(url_templates)} URL templates from {len(seen_urls)} seen URLs")
+        except Exception as e:
+            print(f"Warning: Could not seed URL templates: {e}")
 
     if not sources:
         print("No sources found. Ensure 'sources' sheet exists and has URLs.")
@@ -522,21 +1257,94 @@ def main():
         )
         return
 
+    sources_by_id = {source.get("municipality", ""): source for source in sources}
+    if crawl_scheduler:
+        # Sources that rarely produce listings are scanned less often
+        total_sources = len(sources)
+        sources = crawl_scheduler.due_sources(sources)
+        print(f"🗓️ {len(sources)}/{total_sources} sources due for a scan")
+
     # ============================================
-    # PHASE 1: Discovery - Find all new URLs
+    # PHASE 1 + 2: Discovery streams into AI analysis
     # ============================================
-    print(f"\n📡 Phase 1: Discovering new URLs from {len(sources)} sources...\n")
-    all_discoveries = []  # List of (source, url) tuples
+    # Sources are discovered concurrently and each discovered URL is handed to
+    # the analysis pipeline as soon as its source has been mapped, so scraping and AI analysis of early sources
+    # overlap with discovery of the remaining ones.
+    print(f"\n📡 Phase 1: Discovering new URLs from {len(sources)} sources (analysis starts as URLs arrive)...\n")
+    all_discoveries = []  # List of (source, url) tuples, one per canonical URL
+    admitted_urls = set()  # Canonical form of every admitted URL
+    pipeline = AnalysisPipeline(timestamp, stats, seen_urls)
+
+    if credit_budget.limited:
+        # Spend the budget on the sources most likely to yield proposals first
+        sources = sorted(sources, key=credit_budget.expected_value, reverse=True)
+        print(f"💳 Credit budget: {credit_budget.remaining()} credits available this run")
+
+    def admit(source: dict, url: str):
+        # Log each discovery to 'discoveries' tab (raw Firecrawl findings)
+        append_row_safe(
+            "discoveries",
+            [
+                timestamp,
+                source.get("municipality", ""),
+                source.get("name", ""),
+                url,
+                source.get("type", "")
+            ],
+            stats,
+            context=source.get("municipality", "")
+        )
+        pipeline.submit(source, url)
+        if canonicalize_url(url) in admitted_urls:
+            # Already queued from another source: analysed once, credited to both
+            stats["duplicate_discoveries"] += 1
+            return
+        admitted_urls.add(canonicalize_url(url))
+        if url_templates is not None:
+            url_templates.sampled(url)
+        all_discoveries.append((source, url))
+        stats["urls_discovered"] += 1
+
+    # URLs left over from earlier runs go first and count against the global cap
+    backlog_urls = []
+    if discovery_backlog is not None:
+        backlog_urls = discovery_backlog.drain(MAX_TOTAL_DISCOVERIES_PER_RUN, set(sources_by_id), seen_urls)
+        if source_snapshots:
+            # Rediscoverable on the source's next mapping instead of lost with the entry
+            for source_id, url in discovery_backlog.expired:
+                source_snapshots.forget(source_id, url, remap=False)
+        if backlog_urls:
+            print(f"📥 Backlog: {len(backlog_urls)} URLs from earlier runs ({len(discovery_backlog)} still queued)")
+        for source_id, url in backlog_urls:
+            mirror_backlog("drained", source_id, url, timestamp, stats)
+            admit(sources_by_id[source_id], url)
+    if len(backlog_urls) >= MAX_TOTAL_DISCOVERIES_PER_RUN:
+        print("📥 Backlog filled the discovery cap, skipping fresh discovery this run")
+        sources = []
 
-    for source in sources:
-        # Check global discovery limit
-        if len(all_discoveries) >= MAX_TOTAL_DISCOVERIES_PER_RUN:
-            print(f"⚠️ Reached global discovery limit ({MAX_TOTAL_DISCOVERIES_PER_RUN}). Stopping discovery.")
-            break
-            
-        stats["sources_processed"] += 1
-        new_urls, discovery_error = discover_new_urls(source, seen_urls)
+    # Every source gets a fair share of the remaining cap right away; the rest
+    # goes to the best-scored leftovers once all sources are discovered
+    admission = DiscoveryAdmission(
+        MAX_TOTAL_DISCOVERIES_PER_RUN - len(backlog_urls), len(sources), MAX_URLS_PER_SOURCE,
+        scorer=(lambda urls, source_type: url_scorer.score_many(urls)) if url_scorer else None
+    )
 
+    def merge_discovery(source: dict, kind: str, credits: int, future: Future):
+        source_id = source.get("municipality", "")
+        try:
+            new_urls, discovery_error = future.result()
+        except Exception as e:
+            new_urls, discovery_error = [], str(e)
+        if (new_urls is None or discovery_error == CIRCUIT_OPEN
+                or (sitemap_discovery and source_id in sitemap_discovery.served)
+                or (kortinfo_data and source_id in kortinfo_data.served)
+                or (feed_discovery and source_id in feed_discovery.served)):
+            credit_budget.refund(source_id, kind, credits)
+
+        if new_urls is None:
+            if crawl_scheduler:
+                crawl_scheduler.record_scan(source)
+            return
         if discovery_error:
             error_entry = {
                 "source_id": source.get("municipality", ""),
@@ -551,34 +1359,91 @@ def main():
                 "discovery_failed",
                 discovery_error
             )
-            # Skip to next source since we could not discover URLs here
-            continue
-
-        # Log each discovery to 'discoveries' tab (raw Firecrawl findings)
+            if crawl_scheduler:
+                crawl_scheduler.record_scan(source, failed=True)
+            return
+        credit_budget.record_discovery(source_id, len(new_urls))
+        if crawl_scheduler:
+            crawl_scheduler.record_scan(source, len(new_urls))
+
+        if url_scorer and URL_SCORE_THRESHOLD > 0:
+            # Not marked as seen and dropped from the source's snapshot, so a retrained
+            # model rates them again when a map-discovered source is next mapped. For
+            # sitemap, feed and kortinfo sources the watermark has moved on: the skip is final.
+            kept = []
+            for url, score in zip(new_urls, url_scorer.score_many(new_urls)):
+                if score >= URL_SCORE_THRESHOLD or canonicalize_url(url) in admitted_urls:
+                    kept.append(url)
+                else:
+                    stats["url_score_skipped"].append({"url": url, "source_id": source_id, "score": round(score, 3)})
+                    if source_snapshots:
+                        source_snapshots.forget(source_id, url, remap=False)
+            new_urls = kept
+
+        if url_templates is not None:
+            # Not marked as seen and dropped from the source's snapshot, so a map-discovered
+            # source offers them again when next mapped; for sitemap, feed and kortinfo
+            # sources the watermark has moved on and only later URLs can be resamples
+            kept = []
+            for url in new_urls:
+                if canonicalize_url(url) not in admitted_urls and url_templates.should_skip(url):
+                    stats["template_skipped"].append({"url": url, "source_id": source_id})
+                    if source_snapshots:
+                        source_snapshots.forget(source_id, url, remap=False)
+                else:
+                    kept.append(url)
+            new_urls = kept
+
+        # URLs another source already brought in do not take up admission slots
         for url in new_urls:
-            append_row_safe(
-                "discoveries",
-                [
-                    timestamp,
-                    source.get("municipality", ""),
-                    source.get("name", ""),
-                    url,
-                    source.get("type", "")
-                ],
-                stats,
-                context=source.get("municipality", "")
-            )
-            all_discoveries.append((source, url))
-            stats["urls_discovered"] += 1
+            if canonicalize_url(url) in admitted_urls:
+                admit(source, url)
+        for url in admission.offer(source, [url for url in new_urls if canonicalize_url(url) not in admitted_urls]):
+            admit(source, url)
+
+    # Sources are discovered concurrently (Firecrawl calls still share one rate
+    # limit); results are merged in source order so admission stays deterministic
+    if ANALYSIS_MODE == "sequential":
+        discovery_pool = _InlineExecutor()
+    else:
+        discovery_pool = ThreadPoolExecutor(DISCOVERY_WORKERS, thread_name_prefix="discovery")
+    pending = deque()  # (source, kind, credits, future) in source order
+    planned_headroom = 0  # Credits the reserved discoveries usually lead to in scrapes
+
+    for position, source in enumerate(sources):
+        # Reserve the discovery call, keeping room for the scrapes it and the
+        # discoveries reserved before it usually lead to
+        source_id = source.get("municipality", "")
+        backend = get_backend(source)
+        kind, credits = discovery_credits(source, backend)
+        headroom = planned_headroom + credit_budget.expected_urls(source_id) * CREDITS_PER_CALL.get(backend.name, 0)
+        if not credit_budget.reserve(source_id, kind, credits, headroom=headroom):
+            print(f"💳 Credit budget exhausted. Deferring {len(sources) - position} remaining sources.")
+            for deferred in sources[position:]:
+                credit_budget.defer_source(deferred.get("municipality", ""))
+            break
+        planned_headroom = headroom
+
+        stats["sources_processed"] += 1
+        pending.append((source, kind, credits, discovery_pool.submit(discover_source, source, seen_urls)))
+        while pending and pending[0][3].done():
+            merge_discovery(*pending.popleft())
+
+    while pending:
+        merge_discovery(*pending.popleft())
+    discovery_pool.shutdown()
+
+    for source, url in admission.drain():
+        admit(source, url)
+    if admission.dropped:
+        # Not marked as seen; queued in the backlog (or rediscovered) for a later run
+        stats["discovery_capped"] = len(admission.dropped)
+        print(f"⚠️ Reached discovery limits ({MAX_TOTAL_DISCOVERIES_PER_RUN} per run, {MAX_URLS_PER_SOURCE} per source). "
+              f"Left {len(admission.dropped)} lower-priority URLs for a later run.")
 
     discovery_count = len(all_discoveries)
     print(f"\n📊 Discovery complete: Found {discovery_count} new URLs")
 
-    # ============================================
-    # PHASE 2: AI Analysis (only if new URLs found)
-    # ============================================
-    proposals_list = []  # Collect for Slack notification
-
     if not all_discoveries:
         summary_parts = [
             f"Processed {len(sources)} sources",
@@ -595,93 +1460,40 @@ def main():
         )
         print(f"\n✅ {summary}")
     else:
-        print(f"\n🤖 Phase 2: Running AI analysis on {discovery_count} URLs...\n")
-
-    for source, url in all_discoveries:
-        stats["urls_attempted"] += 1
-        source_id = source.get("municipality", "unknown")
-
-        # Scrape content with retry logic
-        scrape_result, scrape_error = scrape_with_retry(url, {"formats": ["markdown"]})
-
-        if scrape_error:
-            print(f"  ❌ Scrape FAILED for {url}: {scrape_error}", flush=True)
-            stats["scrape_failed"].append({"url": url, "source_id": source_id, "error": scrape_error})
-            log_failure(timestamp, url, source_id, "scrape_failed", scrape_error)
-            # Still mark as seen to avoid re-processing
-            append_row_safe("seen_urls", [url, timestamp], stats, context=source_id)
-            seen_urls.add(url)
-            continue
-
-        stats["scrape_success"] += 1
-        content = scrape_result.get("markdown", "") if scrape_result else ""
-
-        # Classify relevance (loose filter)
-        try:
-            classification = classify_relevance(url, content)
-            stats["classification_success"] += 1
-        except Exception as e:
-            print(f"  ❌ Classification FAILED for {url}: {e}", flush=True)
-            stats["classification_failed"].append({"url": url, "source_id": source_id, "error": str(e)})
-            log_failure(timestamp, url, source_id, "classification_failed", str(e))
-            # Still mark as seen
-            append_row_safe("seen_urls", [url, timestamp], stats, context=source_id)
-            seen_urls.add(url)
-            continue
-
-        if not classification.get("is_relevant", False):
-            print(f"  ⏭️ Skipping (not relevant): {url} - {classification.get('reason', '')}", flush=True)
-            stats["skipped_irrelevant"] += 1
-            # Mark as seen to avoid re-processing
-            append_row_safe("seen_urls", [url, timestamp], stats, context=source_id)
-            seen_urls.add(url)
-            continue
-
-        print(f"  ✓ Relevant ({classification.get('category', 'unknown')}): {url}", flush=True)
-
-        # Extract structured data (reuse scraped content)
-        try:
-            data = extract_property_data(url, pre_scraped_content=content)
-        except Exception as e:
-            print(f"  ❌ Extraction FAILED for {url}: {e}", flush=True)
-            stats["extraction_failed"].append({"url": url, "source_id": source_id, "error": str(e)})
-            log_failure(timestamp, url, source_id, "extraction_failed", str(e))
-            append_row("seen_urls", [url, timestamp])
-            seen_urls.add(url)
-            continue
-
-        if data:
-            stats["extraction_success"] += 1
-            stats["proposals_created"] += 1
-
-            # Simplified proposals row: timestamp, municipality, title, url, confidence, summary, published_date
-            row = [
-                timestamp,
-                source.get("municipality", ""),
-                data.get("title", ""),
-                url,
-                data.get("confidence", 0),
-                data.get("summary", ""),
-                data.get("published_date", "")
-            ]
-            append_row_safe("proposals", row, stats, context=source_id)
-
-            # Collect for Slack notification
-            proposals_list.append({
-                "municipality": source.get("name", source.get("municipality", "")),
-                "title": data.get("title", "Untitled"),
-                "url": url,
-                "confidence": data.get("confidence", 0),
-                "published_date": data.get("published_date", "")
-            })
-        else:
-            # Extraction returned None (failed internally)
-            stats["extraction_failed"].append({"url": url, "source_id": source_id, "error": "Extraction returned None"})
-            log_failure(timestamp, url, source_id, "extraction_failed", "Extraction returned None")
-
-        # Mark as seen
-        append_row_safe("seen_urls", [url, timestamp], stats, context=source_id)
-        seen_urls.add(url)
+        print(f"\n🤖 Phase 2: Finishing AI analysis on {discovery_count} URLs...\n")
+
+    proposals_list = pipeline.join()
+    if circuit_breaker:
+        circuit_breaker.save()
+    if sitemap_discovery:
+        sitemap_discovery.save()
+    if crawl_scheduler:
+        crawl_scheduler.save()
+    if url_templates is not None:
+        url_templates.save()
+    if kortinfo_data:
+        kortinfo_data.save()
+        stats["kortinfo_plot_changes"] = kortinfo_data.changes
+    if feed_discovery:
+        feed_discovery.save()
+    # URLs left for a later run: queue them, or drop them from the snapshots so
+    # they are rediscovered
+    leftovers = [
+        (entry["source_id"], entry["url"])
+        for entry in stats["scrape_failed"] + stats["budget_deferred"]
+        if canonicalize_url(entry["url"]) not in seen_urls
+    ] + admission.dropped
+    if discovery_backlog is not None:
+        for source_id, url in leftovers:
+            if discovery_backlog.add(source_id, url, timestamp):
+                mirror_backlog("queued", source_id, url, timestamp, stats)
+        discovery_backlog.save()
+    elif source_snapshots:
+        for source_id, url in leftovers:
+            source_snapshots.forget(source_id, url)
+    if source_snapshots:
+        source_snapshots.save()
+    stats["credits"] = credit_budget.stats()
 
     # ============================================
     # PHASE 3: Summary + Slack Notification
@@ -694,6 +1506,9 @@ def main():
         len(stats["sheet_failed"])
     )
 
+    limiter_stats = firecrawl_limiter.stats()
+    stats["rate_limit_wait_seconds"] = limiter_stats["waited_seconds"]
+
     # Build detailed summary
     summary_parts = [
         f"Processed {stats['sources_processed']} sources",
@@ -702,8 +1517,73 @@ def main():
         f"Proposals: {stats['proposals_created']}",
         f"Skipped: {stats['skipped_irrelevant']} (not relevant)",
     ]
+    if stats["preflight_skipped"]:
+        summary_parts.append(f"Preflight skipped: {len(stats['preflight_skipped'])}")
+    if stats["template_skipped"]:
+        summary_parts.append(f"Zero-yield template skipped: {len(stats['template_skipped'])}")
+    if stats["url_score_skipped"]:
+        summary_parts.append(f"Low URL score skipped: {len(stats['url_score_skipped'])}")
     if stats["discovery_failed"]:
         summary_parts.append(f"Discovery failures: {len(stats['discovery_failed'])}")
+    if stats["duplicate_discoveries"]:
+        summary_parts.append(f"Duplicates merged: {stats['duplicate_discoveries']}")
+    if in_flight.coalesced:
+        stats["coalesced_fetches"] = in_flight.coalesced
+        summary_parts.append(f"Coalesced fetches: {in_flight.coalesced}")
+    if backlog_urls:
+        summary_parts.append(f"From backlog: {len(backlog_urls)}")
+    if admission.dropped:
+        summary_parts.append(f"Over discovery cap: {len(admission.dropped)} URLs left for a later run")
+    if discovery_backlog is not None and len(discovery_backlog):
+        stats["backlog_size"] = len(discovery_backlog)
+        summary_parts.append(f"Backlog: {len(discovery_backlog)} URLs queued")
+    if crawl_scheduler and crawl_scheduler.not_due:
+        stats["schedule"] = crawl_scheduler.stats()
+        summary_parts.append(f"Not due: {len(crawl_scheduler.not_due)} sources (adaptive schedule)")
+    if source_snapshots and source_snapshots.skipped:
+        stats["sources_unchanged"] = len(source_snapshots.skipped)
+        summary_parts.append(f"Unchanged sources: {len(source_snapshots.skipped)} (not mapped)")
+    if feed_discovery and feed_discovery.served:
+        summary_parts.append(f"Feed discoveries: {len(feed_discovery.served)} news sources (no map call)")
+    if kortinfo_data and kortinfo_data.served:
+        changed_plots = sum(len(change["new"]) + len(change["status_changed"]) for change in kortinfo_data.changes.values())
+        summary_parts.append(f"Kortinfo data layer: {len(kortinfo_data.served)} sites, {changed_plots} new/changed plots")
+    if sitemap_discovery and sitemap_discovery.served:
+        summary_parts.append(f"Sitemap discoveries: {len(sitemap_discovery.served)} sources (no map call)")
+    open_hosts = circuit_breaker.open_hosts() if circuit_breaker else []
+    if open_hosts:
+        stats["circuit_open_hosts"] = open_hosts
+        short_circuited = sum(1 for failure in stats["scrape_failed"] if failure["error"] == CIRCUIT_OPEN)
+        summary_parts.append(f"Circuits open: {len(open_hosts)} ({short_circuited} URLs failed fast)")
+    summary_parts.append(
+        f"Firecrawl calls: {limiter_stats['calls']} (rate-limit wait {stats['rate_limit_wait_seconds']}s)"
+    )
+    summary_parts.append(credit_budget.summary())
+    static_stats = backends["static"].stats()
+    if static_stats["static_pages"] or static_stats["fallbacks"]:
+        summary_parts.append(
+            f"Static fetches: {static_stats['static_pages']} ({static_stats['fallbacks']} fell back to Firecrawl)"
+        )
+    browser = backends["crawl4ai"]
+    browser.close()
+    browser_stats = browser.stats()
+    if browser_stats["pages"]:
+        stats["crawl4ai"] = browser_stats
+        summary_parts.append(
+            f"crawl4ai pages: {browser_stats['pages']} (peak {browser_stats['peak_rss_mb']} MB, "
+            f"~{browser_stats['per_worker_mb']} MB/page worker)"
+        )
+    if scrape_cache:
+        cache_stats = scrape_cache.stats()
+        stats["scrape_cache_hits"] = cache_stats["hits"]
+        if cache_stats["hits"]:
+            summary_parts.append(f"Cache hits: {cache_stats['hits']}")
+    retry_stats = retry_policy.stats()
+    if retry_stats["retries"] or retry_stats["budget_exhausted"]:
+        summary_parts.append(
+            f"Retries: {retry_stats['retries']} ({retry_stats['waited_seconds']}s backoff"
+            + (", budget exhausted" if retry_stats["budget_exhausted"] else "") + ")"
+        )
     if stats.get("sheet_failed"):
         summary_parts.append(f"Sheet failures: {len(stats['sheet_failed'])}")
     if total_failures > 0:
@@ -711,6 +1591,7 @@ def main():
 
     summary = " | ".join(summary_parts)
     append_row_safe("events", [timestamp, "system", "Run Summary", summary, "", "", "", ""], stats, context="run_summary")
+    credit_budget.save()
     print(f"\n✅ {summary}")
 
     # Print failure breakdown if any
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from http_session import make_session
+
+ROBOTS_AGENT = "GrundsalgMonitor"  # product token of http_session.USER_AGENT, matched against robots.txt groups
+MAX_CRAWL_DELAY = 30.0  # ignore absurd Crawl-delay values instead of stalling the run
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+class RobotsCache:
+    """Fetches robots.txt once per host and exposes its Crawl-delay."""
+
+    def __init__(self, timeout: float = 5, pool_size: int = 4):
+        self.timeout = timeout
+        self._delays = {}
+        self._lock = threading.Lock()
+        self.session = make_session(pool_size)
+
+    def crawl_delay(self, url: str) -> Optional[float]:
+        parsed = urlparse(url)
+        host = parsed.netloc.lower()
+        with self._lock:
+            if host in self._delays:
+                return self._delays[host]
+
+        delay = None
+        try:
+            r = self.session.get(f"{parsed.scheme}://{parsed.netloc}/robots.txt", timeout=self.timeout)
+            if r.status_code == 200:
+                parser = RobotFileParser()
+                parser.parse(r.text.splitlines())
+                delay = parser.crawl_delay(ROBOTS_AGENT)
+                delay = min(float(delay), MAX_CRAWL_DELAY) if delay else None
+        except (requests.RequestException, ValueError):
+            pass
+
+        with self._lock:
+            self._delays[host] = delay
+        return delay
+
+
+class _Host:
+    def __init__(self, delay: float):
+        self.queue = deque()
+        self.active = 0
+        self.delay = delay
+        self.next_start = 0.0
+        self.robots_checked = False
+
+
+class HostScheduler:
+    """
+    Per-host politeness in front of an executor.
+
+    Work is queued per host and dispatched round-robin, so URLs from one
+    kommune's site are interleaved with every other domain instead of being
+    fetched all at once. Each host gets at most `per_host_concurrency` tasks in
+    flight and `per_host_delay` seconds (or its robots.txt Crawl-delay, if
+    larger) between task starts. At most `max_in_flight` tasks are handed to the
+    executor at a time, so the scheduler, not the executor queue, decides order.
+    """
+
+    def __init__(self, executor, max_in_flight: int, per_host_concurrency: int = 2,
+                 per_host_delay: float = 1.0, robots: Optional[RobotsCache] = None):
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_delay = per_host_delay
+        self.robots = robots
+        self.hosts = {}
+        self.order = deque()  # Round-robin order of hosts
+        self.in_flight = 0
+        self.pending = 0
+        self._timer = None
+        self._timer_at = None
+        self._cond = threading.Condition()
+
+    def submit(self, url: str, fn: Callable, *args):
+        """Queue fn(*args) to run under the politeness rules for url's host."""
+        host = host_of(url)
+        with self._cond:
+            if host not in self.hosts:
+                self.hosts[host] = _Host(self.per_host_delay)
+                self.order.append(host)
+            self.hosts[host].queue.append((url, fn, args))
+            self.pending += 1
+        self._dispatch()
+
+    def wait(self):
+        """Block until every queued task has finished."""
+        with self._cond:
+            while self.pending:
+                self._cond.wait()
+
+    def _dispatch(self):
+        ready = []
+        with self._cond:
+            now = time.monotonic()
+            earliest = None
+            for _ in range(len(self.order)):
+                if self.in_flight >= self.max_in_flight:
+                    break
+                host_name = self.order[0]
+                self.order.rotate(-1)
+                host = self.hosts[host_name]
+                if not host.queue or host.active >= self.per_host_concurrency:
+                    continue
+                if host.next_start > now:
+                    earliest = host.next_start if earliest is None else min(earliest, host.next_start)
+                    continue
+                host.active += 1
+                host.next_start = now + host.delay
+                self.in_flight += 1
+                ready.append((host_name, host.queue.popleft()))
+
+            # Hosts that are only waiting out their delay need a wake-up call
+            if earliest is not None and self.in_flight < self.max_in_flight:
+                if self._timer is None or earliest < self._timer_at:
+                    if self._timer is not None:
+                        self._timer.cancel()
+                    self._timer = threading.Timer(max(0.0, earliest - now), self._wake)
+                    self._timer.daemon = True
+                    self._timer_at = earliest
+                    self._timer.start()
+
+        for host_name, (url, fn, args) in ready:
+            self.executor.submit(self._run, host_name, url, fn, args)
+
+    def _wake(self):
+        with self._cond:
+            self._timer = None
+            self._timer_at = None
+        self._dispatch()
+
+    def _run(self, host_name: str, url: str, fn: Callable, args: tuple):
+        host = self.hosts[host_name]
+        try:
+            with self._cond:
+                check_robots = self.robots is not None and not host.robots_checked
+                host.robots_checked = True
+            if check_robots:
+                crawl_delay = self.robots.crawl_delay(url)
+                if crawl_delay and crawl_delay > host.delay:
+                    with self._cond:
+                        host.delay = crawl_delay
+                        host.next_start = max(host.next_start, time.monotonic() + crawl_delay)
+            fn(*args)
+        except Exception as e:
+            print(f"  Warning: Task for {url} crashed: {e}")
+        finally:
+            with self._cond:
+                host.active -= 1
+                self.in_flight -= 1
+                self.pending -= 1
+                self._cond.notify_all()
+            self._dispatch()
@@ -0,0 +1,58 @@
+from typing import Optional
+
+import requests
+
+from canonical import canonicalize_url
+from http_session import make_session
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+
+class Preflight:
+    """
+    Cheap HEAD (or header-only GET) check before a URL is sent to Firecrawl.
+
+    Follows redirects to the final URL and rejects non-HTML, oversized and
+    redirected-to-seen responses. Network errors fail open: the URL is passed
+    on and Firecrawl gets to try. Only URLs not yet in seen_urls reach this
+    check, so there is no per-URL state to compare against; unchanged pages
+    are caught earlier, per source, by SourceSnapshots.
+    """
+
+    def __init__(self, max_bytes: int = 5 * 1024 * 1024, pool_size: int = 8, timeout: float = 10):
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.session = make_session(pool_size)
+
+    def _request(self, url: str) -> requests.Response:
+        response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+        # Some municipal CMSes reject HEAD; a streamed GET reads headers only
+        if response.status_code in (403, 405, 501):
+            response = self.session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+            response.close()
+        return response
+
+    def check(self, url: str, seen_urls: Optional[set] = None) -> tuple[bool, str, str]:
+        """
+        Decide whether url is worth scraping.
+        Returns: (should_scrape, reason, final_url)
+        """
+        try:
+            response = self._request(url)
+        except requests.RequestException as e:
+            return True, f"preflight_error: {e.__class__.__name__}", url
+
+        final_url = response.url or url
+        if response.status_code >= 400:
+            # Let Firecrawl and the retry policy decide; HEAD answers are not always reliable
+            return True, f"preflight_status_{response.status_code}", final_url
+        if final_url != url and seen_urls is not None and canonicalize_url(final_url) in seen_urls:
+            return False, "redirect_to_seen", final_url
+
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+        if content_type and content_type not in HTML_CONTENT_TYPES:
+            return False, f"non_html: {content_type}", final_url
+        content_length = response.headers.get("Content-Length", "")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            return False, f"oversized: {int(content_length) // 1024} KB", final_url
+        return True, "ok", final_url
@@ -0,0 +1,69 @@
+import threading
+import time
+
+# Requests per minute per Firecrawl plan (scrape and map share the budget)
+FIRECRAWL_PLAN_LIMITS = {
+    "free": 15,
+    "hobby": 100,
+    "standard": 500,
+    "growth": 5000,
+}
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by every call site of one API.
+
+    The bucket holds up to `per_minute` tokens and refills continuously, so
+    callers only block once the per-minute budget is actually used up. Time
+    spent blocking is accumulated in `waited_seconds` for the run summary.
+    """
+
+    def __init__(self, per_minute: float, name: str = "api"):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.name = name
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0  # tokens per second
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.calls = 0
+        self.waited_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_firecrawl_plan(cls, plan: str) -> "RateLimiter":
+        """Build a limiter for a Firecrawl plan tier name (see FIRECRAWL_PLAN_LIMITS)."""
+        plan = (plan or "free").lower()
+        if plan not in FIRECRAWL_PLAN_LIMITS:
+            print(f"Warning: Unknown Firecrawl plan '{plan}', using free tier limits")
+            plan = "free"
+        return cls(FIRECRAWL_PLAN_LIMITS[plan], name=f"firecrawl:{plan}")
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        Take tokens from the bucket, sleeping only if it is empty.
+        Returns: seconds spent waiting (0.0 when budget was available)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Reserve the tokens up front so concurrent callers queue behind us
+            self.tokens -= tokens
+            self.calls += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited_seconds += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def stats(self) -> dict:
+        """Return call count and total wait time for reporting."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "calls": self.calls,
+                "waited_seconds": round(self.waited_seconds, 1),
+            }
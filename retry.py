@@ -0,0 +1,132 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+# Error classes
+PERMANENT = "permanent"        # Retrying cannot help (404, 401, payment required, ...)
+RATE_LIMITED = "rate_limited"  # Back off for Retry-After, then try again
+TRANSIENT = "transient"        # Timeouts, 5xx, connection resets: exponential backoff
+
+PERMANENT_STATUS_CODES = {400, 401, 402, 403, 404, 405, 410, 422}
+TRANSIENT_STATUS_CODES = {408, 409, 500, 502, 503, 504}
+
+PERMANENT_MARKERS = ["payment required", "insufficient credits", "not found", "forbidden", "unauthorized"]
+RATE_LIMIT_MARKERS = ["rate limit", "too many requests", "429"]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(error: Exception) -> tuple[str, Optional[float]]:
+    """
+    Classify an exception from Firecrawl/requests.
+    Returns: (error_class, retry_after_seconds) - retry_after is only set for rate limits
+    """
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+
+    if status == 429:
+        return RATE_LIMITED, parse_retry_after(response.headers.get("Retry-After"))
+    if status in PERMANENT_STATUS_CODES:
+        return PERMANENT, None
+    if status in TRANSIENT_STATUS_CODES:
+        return TRANSIENT, None
+
+    # Firecrawl wraps some failures in plain Exceptions, so fall back to the message
+    message = str(error).lower()
+    if any(marker in message for marker in RATE_LIMIT_MARKERS):
+        return RATE_LIMITED, None
+    if any(marker in message for marker in PERMANENT_MARKERS):
+        return PERMANENT, None
+    return TRANSIENT, None
+
+
+class RetryBudgetExceeded(Exception):
+    """Raised instead of sleeping when the run's retry-time budget is spent."""
+
+
+class RetryPolicy:
+    """
+    Error-aware retry shared by all Firecrawl call sites.
+
+    Permanent errors fail immediately, rate-limited errors wait for Retry-After
+    (or `rate_limit_delay` when the header is missing), and transient errors
+    use exponential backoff with jitter. Total sleep across the whole run is
+    capped by `budget_seconds` so hopeless retries cannot eat the run.
+    """
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 2.0, max_delay: float = 60.0,
+                 rate_limit_delay: float = 30.0, budget_seconds: float = 600.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+        self.budget_seconds = budget_seconds
+        self.retries = 0
+        self.waited_seconds = 0.0
+        self.budget_exhausted = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with +/-50% jitter for the given attempt (0-based)."""
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.5)
+
+    def _reserve(self, delay: float) -> bool:
+        with self._lock:
+            if self.waited_seconds + delay > self.budget_seconds:
+                self.budget_exhausted += 1
+                return False
+            self.waited_seconds += delay
+            self.retries += 1
+            return True
+
+    def call(self, fn: Callable, description: str = ""):
+        """
+        Call fn() and retry according to the error class.
+        Raises the last exception when retries are exhausted or not allowed.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn()
+            except Exception as e:
+                error_class, retry_after = classify_error(e)
+                if error_class == PERMANENT or attempt >= self.max_retries:
+                    raise
+
+                if error_class == RATE_LIMITED:
+                    delay = min(self.max_delay * 2, retry_after if retry_after is not None else self.rate_limit_delay)
+                else:
+                    delay = self.backoff(attempt)
+
+                if not self._reserve(delay):
+                    raise RetryBudgetExceeded(f"Retry budget exhausted ({self.budget_seconds:.0f}s): {e}") from e
+
+                print(f"  Retry {attempt + 1}/{self.max_retries} for {description} "
+                      f"({error_class}, waiting {delay:.1f}s)...")
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        """Return retry counts and time spent backing off for reporting."""
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "waited_seconds": round(self.waited_seconds, 1),
+                "budget_exhausted": self.budget_exhausted,
+            }
@@ -0,0 +1,101 @@
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from state import load_state, save_state
+
+BACKOFF_FACTOR = 1.5  # interval growth after a scan that found nothing
+TIGHTEN_FACTOR = 0.5  # interval shrink after a scan that produced a proposal
+DUE_SLACK = timedelta(hours=2)  # scheduled runs start a little earlier or later each day
+
+
+class CrawlScheduler:
+    """
+    Adaptive per-source scan frequency.
+
+    Keeps per-source history (last scan, discoveries, proposals, failures) and
+    a scan interval between `min_days` and `max_days`: a scan that produced a
+    proposal halves the interval, a scan that found nothing grows it by half,
+    and failures push the next scan back by one base interval per consecutive
+    failure. A `scan_interval_days` in sources.json pins a source's interval.
+    New sources are due immediately.
+    """
+
+    def __init__(self, state_path: str, base_days: float = 1, min_days: float = 1, max_days: float = 30):
+        self.state_path = state_path
+        self.base_days = base_days
+        self.min_days = min_days
+        self.max_days = max_days
+        self.history = load_state(state_path)
+        self.run = {}  # Source id -> {"urls": ..., "proposals": ..., "failed": ...} for this run
+        self.not_due = []
+        self._lock = threading.Lock()
+
+    def due_sources(self, sources: List[dict]) -> List[dict]:
+        """Return the sources due for a scan, most overdue first."""
+        now = datetime.now(timezone.utc)
+        due = []
+        with self._lock:
+            for source in sources:
+                history = self.history.get(source.get("municipality", ""), {})
+                next_due = datetime.fromisoformat(history["next_due"]) if history.get("next_due") else None
+                if next_due is None or next_due <= now + DUE_SLACK:
+                    due.append((next_due or datetime.min.replace(tzinfo=timezone.utc), source))
+                else:
+                    self.not_due.append(source.get("municipality", ""))
+        due.sort(key=lambda item: item[0])
+        return [source for _, source in due]
+
+    def record_scan(self, source: dict, urls: int = 0, failed: bool = False):
+        source_id = source.get("municipality", "")
+        with self._lock:
+            entry = self.run.setdefault(source_id, {"source": source, "urls": 0, "proposals": 0, "failed": False})
+            entry["urls"] += urls
+            entry["failed"] = entry["failed"] or failed
+
+    def record_proposal(self, source_id: str):
+        with self._lock:
+            if source_id in self.run:
+                self.run[source_id]["proposals"] += 1
+
+    def _next_interval(self, source: dict, history: dict, result: dict) -> float:
+        pinned = source.get("scan_interval_days")
+        if pinned is not None:
+            return float(pinned)
+        interval = history.get("interval_days", self.base_days)
+        if result["failed"]:
+            return interval
+        if result["proposals"]:
+            interval *= TIGHTEN_FACTOR
+        elif not result["urls"]:
+            interval *= BACKOFF_FACTOR
+        return min(self.max_days, max(self.min_days, interval))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"scanned": len(self.run), "not_due": list(self.not_due)}
+
+    def save(self):
+        """Fold this run's results into the history and schedule each scanned source."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            for source_id, result in self.run.items():
+                history = self.history.setdefault(source_id, {})
+                interval = self._next_interval(result["source"], history, result)
+                history["interval_days"] = round(interval, 2)
+                history["last_scan"] = now.isoformat()
+                history["scans"] = history.get("scans", 0) + 1
+                history["urls"] = history.get("urls", 0) + result["urls"]
+                history["proposals"] = history.get("proposals", 0) + result["proposals"]
+                if result["proposals"]:
+                    history["last_proposal"] = now.isoformat()
+                if result["failed"]:
+                    history["failures"] = history.get("failures", 0) + 1
+                    history["consecutive_failures"] = history.get("consecutive_failures", 0) + 1
+                    delay = min(self.max_days, self.base_days * history["consecutive_failures"])
+                else:
+                    history["consecutive_failures"] = 0
+                    delay = interval
+                history["next_due"] = (now + timedelta(days=delay)).isoformat()
+            snapshot = dict(self.history)
+        save_state(self.state_path, snapshot)
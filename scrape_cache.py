@@ -0,0 +1,121 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from canonical import canonicalize_url
+
+# Hours a cached scrape stays fresh, per source type
+DEFAULT_TTL_HOURS = {
+    "dedicated_portal": 20,
+    "kortinfo": 12,
+    "news_feed": 6,
+    "municipality_subsection": 20,
+    "minimal": 72,
+}
+FALLBACK_TTL_HOURS = 20
+
+
+def content_hash(markdown: str) -> str:
+    """Stable hash of scraped markdown, used to spot unchanged pages."""
+    return hashlib.sha256((markdown or "").encode("utf-8")).hexdigest()
+
+
+class ScrapeCache:
+    """
+    SQLite store of Firecrawl scrape results keyed by canonical URL.
+
+    Each row keeps markdown, links, a content hash and the fetch time. Entries
+    expire per source type (DEFAULT_TTL_HOURS) and the oldest rows are evicted
+    once the stored content exceeds `max_bytes`.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 200 * 1024 * 1024, ttl_hours: Optional[dict] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_hours = dict(DEFAULT_TTL_HOURS, **(ttl_hours or {}))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS scrapes (
+                url TEXT PRIMARY KEY,
+                source_type TEXT,
+                markdown TEXT,
+                links TEXT,
+                content_hash TEXT,
+                fetched_at REAL,
+                size INTEGER
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scrapes_fetched_at ON scrapes (fetched_at)")
+        self._conn.commit()
+
+    def get(self, url: str, source_type: Optional[str] = None, formats: Optional[List[str]] = None) -> Optional[dict]:
+        """Return a fresh cached result shaped like a Firecrawl scrape, or None."""
+        ttl_seconds = self.ttl_hours.get(source_type, FALLBACK_TTL_HOURS) * 3600
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT markdown, links, content_hash, fetched_at FROM scrapes WHERE url = ?", (canonicalize_url(url),)
+            ).fetchone()
+            fresh = row is not None and time.time() - row[3] <= ttl_seconds
+            # A markdown-only entry cannot answer a request for links
+            if fresh and "links" in (formats or []) and row[1] is None:
+                fresh = False
+            if not fresh:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        markdown, links, digest, fetched_at = row
+        result = {"markdown": markdown, "content_hash": digest, "fetched_at": fetched_at, "from_cache": True}
+        if links is not None:
+            result["links"] = json.loads(links)
+        return result
+
+    def put(self, url: str, result: dict, source_type: Optional[str] = None):
+        """Store a scrape result and evict old rows if the cache is over size."""
+        markdown = result.get("markdown", "") or ""
+        links = result.get("links")
+        links_json = json.dumps(links) if links is not None else None
+        size = len(markdown.encode("utf-8")) + len(links_json or "")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scrapes VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (canonicalize_url(url), source_type, markdown, links_json, content_hash(markdown), time.time(), size)
+            )
+            self._conn.commit()
+            self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM scrapes").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Drop oldest rows until we are back under 90% of the limit
+        target = int(self.max_bytes * 0.9)
+        freed = 0
+        doomed = []
+        for url, size in self._conn.execute("SELECT url, size FROM scrapes ORDER BY fetched_at"):
+            if total - freed <= target:
+                break
+            doomed.append((url,))
+            freed += size
+        self._conn.executemany("DELETE FROM scrapes WHERE url = ?", doomed)
+        self._conn.commit()
+        print(f"Scrape cache: evicted {len(doomed)} entries ({freed // 1024} KB)")
+
+    def stats(self) -> dict:
+        """Return hit/miss counts for reporting."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
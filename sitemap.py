@@ -0,0 +1,206 @@
+import gzip
+import threading
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+
+from canonical import canonicalize_url
+from http_session import make_session
+from state import load_state, save_state
+
+COMMON_SITEMAP_PATHS = ["/sitemap.xml", "/sitemap_index.xml"]
+MAX_CHILD_SITEMAPS = 50  # per source and run; big CMS indexes can list hundreds
+RECHECK_DAYS = 7  # how long a "no sitemap" result is trusted before probing again
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def parse_lastmod(value: Optional[str]) -> Optional[datetime]:
+    """Parse a W3C datetime (2024-05-01, 2024-05-01T10:00:00+02:00, ...Z) as UTC."""
+    if not value:
+        return None
+    value = value.strip().replace("Z", "+00:00")
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        try:
+            parsed = datetime.strptime(value[:10], "%Y-%m-%d")
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+def _bare_host(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class NotASitemap(Exception):
+    """The document is missing, not XML, or not a urlset/sitemapindex."""
+
+
+class SitemapDiscovery:
+    """
+    Incremental discovery from sitemap.xml / sitemap index files.
+
+    Sitemaps are found via robots.txt or the common paths and parsed with
+    iterparse straight off the response stream, so large indexes are never
+    held in memory. A per-source lastmod watermark means only URLs changed
+    since the last run are returned; children of a sitemap index whose own
+    lastmod is older than the watermark are not fetched at all.
+    """
+
+    def __init__(self, state_path: str, pool_size: int = 4, timeout: float = 15):
+        self.state_path = state_path
+        self.timeout = timeout
+        self.state = load_state(state_path)
+        self.served = set()  # source ids discovered from a sitemap in this run
+        self._lock = threading.Lock()
+        self.session = make_session(pool_size)
+
+    def _find_sitemaps(self, base_url: str) -> List[str]:
+        parsed = urlparse(base_url)
+        root = f"{parsed.scheme}://{parsed.netloc}"
+        try:
+            response = self.session.get(root + "/robots.txt", timeout=self.timeout)
+            if response.status_code == 200:
+                listed = [
+                    line.split(":", 1)[1].strip()
+                    for line in response.text.splitlines()
+                    if line.lower().startswith("sitemap:")
+                ]
+                if listed:
+                    return listed
+        except requests.RequestException:
+            pass
+        return [root + path for path in COMMON_SITEMAP_PATHS]
+
+    def _open(self, url: str):
+        response = self.session.get(url, stream=True, timeout=self.timeout)
+        if response.status_code != 200:
+            response.close()
+            raise NotASitemap(f"HTTP {response.status_code}")
+        response.raw.decode_content = True
+        stream = gzip.GzipFile(fileobj=response.raw) if url.lower().endswith(".gz") else response.raw
+        return response, stream
+
+    def _iter_sitemap(self, url: str, watermark: datetime, fetched: list) -> Iterator[tuple[str, Optional[datetime]]]:
+        """Yield (loc, lastmod) for every <url>, descending into sitemap indexes."""
+        fetched.append(url)
+        response, stream = self._open(url)
+        children = []
+        root = None
+        loc = lastmod = None
+        try:
+            for event, elem in ET.iterparse(stream, events=("start", "end")):
+                name = local_name(elem.tag)
+                if event == "start":
+                    if root is None:
+                        if name not in ("urlset", "sitemapindex"):
+                            raise NotASitemap(f"unexpected root <{name}>")
+                        root = elem
+                    continue
+                if name == "loc":
+                    loc = (elem.text or "").strip()
+                elif name == "lastmod":
+                    lastmod = parse_lastmod(elem.text)
+                elif name in ("url", "sitemap"):
+                    if loc and name == "url":
+                        yield loc, lastmod
+                    elif loc and (lastmod is None or lastmod > watermark):
+                        children.append(urljoin(url, loc))
+                    loc = lastmod = None
+                    # Drop finished entries so memory stays flat on huge sitemaps
+                    root.clear()
+        except ET.ParseError as e:
+            raise NotASitemap(f"not XML: {e}")
+        finally:
+            response.close()
+
+        for child in children:
+            if len(fetched) >= MAX_CHILD_SITEMAPS:
+                print(f"  Sitemap index {url}: stopping after {MAX_CHILD_SITEMAPS} sitemaps")
+                break
+            try:
+                yield from self._iter_sitemap(child, watermark, fetched)
+            except (NotASitemap, requests.RequestException, OSError) as e:
+                print(f"  Warning: Skipping sitemap {child}: {e}")
+
+    def discover(self, source: dict, keywords: str, limit: int, seen_urls: Iterable[str] = ()) -> Optional[List[str]]:
+        """
+        Return up to `limit` URLs on the source's site changed since the last
+        run, newest first, that sit under the source's path or mention one of
+        `keywords` and are not in `seen_urls` (compared in canonical form).
+        Returns None when the site has no usable sitemap (caller falls back to map).
+        """
+        source_id = source.get("municipality", "")
+        base_url = source.get("url", "")
+        with self._lock:
+            entry = dict(self.state.get(source_id, {}))
+        now = datetime.now(timezone.utc)
+
+        checked_at = parse_lastmod(entry.get("checked_at"))
+        if entry.get("sitemaps") == [] and checked_at and now - checked_at < timedelta(days=RECHECK_DAYS):
+            return None
+
+        watermark = parse_lastmod(entry.get("watermark")) or EPOCH
+        base_host = _bare_host(base_url)
+        base_path = urlparse(base_url).path.rstrip("/").lower()
+        words = [word.lower() for word in keywords.split() if len(word) > 3]
+
+        candidates = entry.get("sitemaps") or self._find_sitemaps(base_url)
+        working = []
+        matches = []
+        newest = watermark
+        for sitemap_url in candidates:
+            fetched = []
+            try:
+                for loc, lastmod in self._iter_sitemap(sitemap_url, watermark, fetched):
+                    if _bare_host(loc) != base_host:
+                        continue
+                    if lastmod is not None:
+                        newest = max(newest, lastmod)
+                        if lastmod <= watermark:
+                            continue
+                    path = urlparse(loc).path.lower()
+                    if path.startswith(base_path) or any(word in path for word in words):
+                        matches.append((lastmod or EPOCH, loc))
+                working.append(sitemap_url)
+            except (NotASitemap, requests.RequestException, OSError) as e:
+                if entry.get("sitemaps"):
+                    print(f"  Warning: Sitemap {sitemap_url} unusable: {e}")
+
+        entry["checked_at"] = now.isoformat()
+        entry["sitemaps"] = working
+        if not working:
+            with self._lock:
+                self.state[source_id] = entry
+            return None
+
+        matches.sort(reverse=True)
+        # Drop seen URLs before cutting to the limit, so the next run gets the rest
+        urls = [
+            loc for loc in dict.fromkeys(loc for _, loc in matches)
+            if canonicalize_url(loc) not in seen_urls and not loc.lower().endswith(".pdf")
+        ]
+        # Only move the watermark when nothing was cut off
+        if len(urls) <= limit:
+            entry["watermark"] = newest.isoformat()
+        with self._lock:
+            self.state[source_id] = entry
+            self.served.add(source_id)
+        print(f"  Sitemap: {len(urls)} new changed URLs since {watermark.date() if watermark > EPOCH else 'first run'}")
+        return urls[:limit]
+
+    def save(self):
+        with self._lock:
+            snapshot = dict(self.state)
+        save_state(self.state_path, snapshot)
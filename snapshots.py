@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+import requests
+
+from html_markdown import html_to_markdown
+from http_session import make_session
+from state import load_state, save_state
+
+
+class SourceSnapshots:
+    """
+    Per-source snapshot of the landing page and the links discovered from it.
+
+    Before a source is re-mapped, a conditional GET on its landing page decides
+    whether anything changed: a 304, or the same hash of the page's text and
+    links, means the map call can be skipped. When the source is mapped, only
+    URLs not already in its snapshot are passed on. Network errors fail open,
+    and a snapshot older than `max_age_days` always triggers a re-map.
+    """
+
+    def __init__(self, state_path: str, max_age_days: float = 7, pool_size: int = 4, timeout: float = 15):
+        self.state_path = state_path
+        self.max_age = timedelta(days=max_age_days)
+        self.timeout = timeout
+        self.snapshots = load_state(state_path)
+        self.pending = {}  # Source id -> landing-page validators, committed once discovery succeeds
+        self.skipped = []  # Source ids whose discovery was skipped in this run
+        self._lock = threading.Lock()
+        self.session = make_session(pool_size)
+
+    def check(self, source: dict) -> tuple[bool, str]:
+        """
+        Decide whether a source needs to be re-mapped.
+        Returns: (changed, reason)
+        """
+        source_id = source.get("municipality", "")
+        url = source.get("url", "")
+        with self._lock:
+            previous = dict(self.snapshots.get(source_id, {}))
+        if not previous.get("content_hash") or previous.get("url") != url:
+            changed, reason = True, "no_snapshot"
+        else:
+            mapped_at = datetime.fromisoformat(previous.get("mapped_at", "1970-01-01T00:00:00+00:00"))
+            if datetime.now(timezone.utc) - mapped_at > self.max_age:
+                changed, reason = True, "stale"
+            else:
+                changed, reason = None, ""
+
+        headers = {}
+        if changed is None and previous.get("etag"):
+            headers["If-None-Match"] = previous["etag"]
+        if changed is None and previous.get("last_modified"):
+            headers["If-Modified-Since"] = previous["last_modified"]
+        try:
+            response = self.session.get(url, headers=headers, allow_redirects=True, timeout=self.timeout)
+        except requests.RequestException as e:
+            return True, f"check_error: {e.__class__.__name__}"
+        if response.status_code == 304:
+            return self._unchanged(source_id, "not_modified")
+        if response.status_code != 200:
+            return True, f"check_status_{response.status_code}"
+
+        markdown, links = html_to_markdown(response.text, response.url or url)
+        digest = hashlib.sha256("\n".join([markdown] + sorted(links)).encode("utf-8")).hexdigest()
+        with self._lock:
+            self.pending[source_id] = {
+                "url": url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "content_hash": digest,
+            }
+        if changed is None and digest == previous.get("content_hash"):
+            return self._unchanged(source_id, "same_content")
+        return True, reason or "content_changed"
+
+    def _unchanged(self, source_id: str, reason: str) -> tuple[bool, str]:
+        with self._lock:
+            self.pending.pop(source_id, None)
+            self.skipped.append(source_id)
+        return False, reason
+
+    def diff(self, source: dict, urls: List[str]) -> List[str]:
+        """Return the URLs not already in the source's snapshot and add them to it."""
+        source_id = source.get("municipality", "")
+        with self._lock:
+            entry = dict(self.snapshots.get(source_id, {}))
+            known = set(entry.get("links", []))
+            new_urls = [url for url in urls if url not in known]
+            entry.update(self.pending.pop(source_id, {}))
+            entry["links"] = sorted(known.union(urls))
+            entry["mapped_at"] = datetime.now(timezone.utc).isoformat()
+            self.snapshots[source_id] = entry
+        return new_urls
+
+    def forget(self, source_id: str, url: str, remap: bool = True):
+        """
+        Drop a URL that was not fully processed, so it is rediscovered the next
+        time the source is mapped. With `remap` the landing-page validators go
+        too, and that is next run; otherwise it is once the landing page changes.
+        """
+        with self._lock:
+            entry = self.snapshots.get(source_id)
+            if not entry or url not in entry.get("links", []):
+                return
+            entry["links"] = [link for link in entry["links"] if link != url]
+            if remap:
+                for key in ("etag", "last_modified", "content_hash"):
+                    entry.pop(key, None)
+
+    def save(self):
+        with self._lock:
+            snapshot = dict(self.snapshots)
+        save_state(self.state_path, snapshot)
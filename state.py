@@ -0,0 +1,35 @@
+import json
+import os
+import threading
+
+_lock = threading.Lock()
+
+
+def load_state(path: str, default=None):
+    """Load a JSON state file from the local cache directory, or return default."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default if default is not None else {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not read state file {path}: {e}")
+        return default if default is not None else {}
+
+
+def save_state(path: str, data) -> bool:
+    """Atomically write a JSON state file (sorted keys so diffs stay readable)."""
+    directory = os.path.dirname(path)
+    tmp_path = f"{path}.tmp"
+    try:
+        with _lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump(data, f, indent=1, sort_keys=True, ensure_ascii=False)
+                f.write("\n")
+            os.replace(tmp_path, path)
+        return True
+    except OSError as e:
+        print(f"Warning: Could not write state file {path}: {e}")
+        return False
@@ -0,0 +1,92 @@
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Iterable
+from urllib.parse import urlsplit
+
+from state import load_state, save_state
+
+VARIABLE_SEGMENT = re.compile(r"^(\d+|[0-9a-f]{8,}|.*\d{3,}.*)$")  # ids, hashes, dated slugs
+
+
+def url_template(url: str) -> str:
+    """
+    Collapse a URL into its path template: host plus path, with id-like
+    segments as * and the last segment cut to its first word
+    (/nyheder/job-sosu-assistent-123 -> /nyheder/job-*).
+    """
+    parts = urlsplit(url.lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    segments = [segment for segment in parts.path.split("/") if segment]
+    template = ["*" if VARIABLE_SEGMENT.match(segment) else segment for segment in segments[:-1]]
+    if segments:
+        words = re.split(r"[-_.]", segments[-1], maxsplit=1)
+        if VARIABLE_SEGMENT.match(words[0]):
+            template.append("*")
+        else:
+            template.append(words[0] + "-*" if len(words) > 1 else words[0])
+    return host + "/" + "/".join(template)
+
+
+class TemplateStats:
+    """
+    Yield per URL template, learned from the URLs the pipeline analyses.
+
+    A template with at least `min_samples` analysed URLs and no proposal is
+    skipped before scraping, except that one URL of it is let through every
+    `resample_days` so a template that starts carrying listings recovers. The
+    resample only counts once that URL is admitted (sampled), so a sample cut
+    by the discovery cap is retried next run.
+    """
+
+    def __init__(self, state_path: str, min_samples: int = 10, resample_days: float = 14):
+        self.state_path = state_path
+        self.min_samples = min_samples
+        self.resample = timedelta(days=resample_days)
+        self.templates = load_state(state_path)  # Template -> {"analysed", "proposals", "skipped", "sampled_at"}
+        self.sampling = {}  # Template -> the URL let through as this run's sample
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self.templates)
+
+    def seed(self, seen_urls: Iterable[str], proposal_urls: Iterable[str]):
+        """Bootstrap from history (seen_urls and proposals sheets) when there is no state yet."""
+        proposal_urls = set(proposal_urls)
+        for url in seen_urls:
+            self.record(url, url in proposal_urls)
+
+    def record(self, url: str, proposal: bool):
+        template = url_template(url)
+        with self._lock:
+            entry = self.templates.setdefault(template, {"analysed": 0, "proposals": 0, "skipped": 0})
+            entry["analysed"] += 1
+            entry["proposals"] += int(proposal)
+
+    def should_skip(self, url: str) -> bool:
+        """True if the URL's template never yields; occasionally lets one through as a sample."""
+        template = url_template(url)
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            entry = self.templates.get(template)
+            if not entry or entry["proposals"] or entry["analysed"] < self.min_samples:
+                return False
+            sampled_at = entry.get("sampled_at")
+            due = not sampled_at or now - datetime.fromisoformat(sampled_at) >= self.resample
+            if due and self.sampling.setdefault(template, url) == url:
+                return False
+            entry["skipped"] += 1
+            return True
+
+    def sampled(self, url: str):
+        """Start the template's resample window once its sample URL has been admitted."""
+        template = url_template(url)
+        with self._lock:
+            if self.sampling.get(template) == url:
+                self.templates[template]["sampled_at"] = datetime.now(timezone.utc).isoformat()
+
+    def save(self):
+        with self._lock:
+            snapshot = dict(self.templates)
+        save_state(self.state_path, snapshot)
@@ -0,0 +1,25 @@
+from admission import DiscoveryAdmission
+
+
+def _in_order(urls, source_type):
+    return [-float(i) for i in range(len(urls))]
+
+
+def test_admission_fair_share_then_round_robin():
+    admission = DiscoveryAdmission(cap=5, source_count=2, per_source=3, scorer=_in_order)
+    a = {"municipality": "a"}
+    b = {"municipality": "b"}
+    assert admission.offer(a, ["a1", "a2", "a3", "a4"]) == ["a1", "a2"]
+    assert admission.offer(b, ["b1", "b2", "b3"]) == ["b1", "b2"]
+    # One slot left: both sources get a round, the cap stops b
+    assert admission.drain() == [(a, "a3")]
+    assert admission.admitted == 5
+    assert sorted(admission.dropped) == [("a", "a4"), ("b", "b3")]
+
+
+def test_admission_per_source_limit():
+    admission = DiscoveryAdmission(cap=10, source_count=1, per_source=2, scorer=_in_order)
+    source = {"municipality": "a"}
+    assert admission.offer(source, ["a1", "a2", "a3"]) == ["a1", "a2"]
+    assert admission.drain() == []
+    assert admission.dropped == [("a", "a3")]
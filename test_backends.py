@@ -0,0 +1,67 @@
+import io
+
+from backends import FirecrawlBackend, StaticHttpBackend, looks_js_dependent, page_encoding
+from ratelimit import RateLimiter
+
+
+def test_page_encoding():
+    assert page_encoding("text/html; charset=ISO-8859-1", b"") == "iso8859-1"
+    assert page_encoding("text/html", b'<html><head><meta charset="windows-1252">') == "cp1252"
+    assert page_encoding("text/html; charset=bogus", "<p>Grundsalg på Østerbro</p>".encode("utf-8")) == "utf-8"
+    assert page_encoding("text/html", "<p>Grundsalg på Østerbro</p>".encode("windows-1252")) != "utf-8"
+
+
+def test_looks_js_dependent():
+    assert looks_js_dependent('<div id="app"></div><noscript>Aktiver JavaScript</noscript>', "")
+    assert not looks_js_dependent("<p>Grunde til salg</p>", "Grunde til salg")
+
+
+class _Raw(io.BytesIO):
+    def read(self, size=-1, decode_content=False):
+        return super().read(size)
+
+
+class _Response:
+    def __init__(self, status_code, body=b"", content_type="text/html; charset=utf-8"):
+        self.status_code = status_code
+        self.headers = {"Content-Type": content_type}
+        self.raw = _Raw(body)
+        self.url = "https://aarhus.dk/grunde"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class _Session:
+    def __init__(self, response):
+        self.response = response
+
+    def get(self, url, **kwargs):
+        return self.response
+
+
+def _static(response, fallback_app=None):
+    backend = StaticHttpBackend(FirecrawlBackend(fallback_app, RateLimiter(60)), min_text_chars=20)
+    backend.session = _Session(response)
+    return backend
+
+
+def test_static_backend_serves_usable_pages():
+    body = "<main><h1>Grunde til salg</h1><p>Parcelhusgrunde i Lystrup og Malling.</p></main>".encode()
+    backend = _static(_Response(200, body))
+    page = backend.scrape("https://aarhus.dk/grunde")
+    assert page["markdown"].startswith("# Grunde til salg")
+    assert page["metadata"]["backend"] == "static"
+    assert backend.stats() == {"static_pages": 1, "fallbacks": 0}
+
+
+def test_static_backend_without_fallback():
+    backend = _static(_Response(503))
+    page = backend.scrape("https://aarhus.dk/grunde")
+    assert page["metadata"]["error"] == "Static fetch unusable and Firecrawl not initialized"
+    assert backend.stats() == {"static_pages": 0, "fallbacks": 1}
+    # Map always needs the fallback
+    assert backend.available() and not backend.map_available()
@@ -0,0 +1,25 @@
+from datetime import datetime, timedelta, timezone
+
+from backlog import DiscoveryBacklog
+
+
+def test_backlog_round_trip(tmp_path):
+    path = str(tmp_path / "backlog.json")
+    now = datetime.now(timezone.utc)
+    backlog = DiscoveryBacklog(path, max_age_days=30)
+    assert backlog.add("a", "https://a.dk/1", (now - timedelta(days=3)).isoformat())
+    assert not backlog.add("a", "https://a.dk/1", now.isoformat())
+    backlog.add("a", "https://a.dk/2", (now - timedelta(days=2)).isoformat())
+    backlog.add("b", "https://b.dk/1", (now - timedelta(days=1)).isoformat())
+    backlog.add("a", "https://a.dk/seen", now.isoformat())
+    backlog.add("gone", "https://gone.dk/1", now.isoformat())
+    backlog.add("a", "https://a.dk/old", (now - timedelta(days=40)).isoformat())
+    backlog.save()
+
+    reloaded = DiscoveryBacklog(path, max_age_days=30)
+    assert len(reloaded) == 6
+    drained = reloaded.drain(2, {"a", "b"}, {"https://a.dk/seen"})
+    # Oldest first, one per source per round
+    assert drained == [("a", "https://a.dk/1"), ("b", "https://b.dk/1")]
+    assert list(reloaded.entries) == ["https://a.dk/2"]
+    assert reloaded.expired == [("a", "https://a.dk/old")]
@@ -0,0 +1,42 @@
+import pytest
+
+from budget import DEFAULT_EXPECTED_URLS, CreditBudget
+
+
+def test_budget_reserve_and_refund(tmp_path):
+    budget = CreditBudget(str(tmp_path / "budget.json"), run_budget=3)
+    assert budget.reserve("a", "map", headroom=2)
+    assert not budget.reserve("a", "map", headroom=2)  # 2 left, map + 2 scrapes needs 3
+    assert budget.reserve("a", "scrape")
+    budget.refund("a", "scrape")
+    assert budget.remaining() == 2
+    assert budget.reserve("b", "scrape", credits=0)
+    assert budget.stats()["credits_by_source"] == {"a": 1}
+
+
+def test_budget_month_total_across_runs(tmp_path):
+    path = str(tmp_path / "budget.json")
+    budget = CreditBudget(path, month_budget=5)
+    assert budget.reserve("a", "scrape", credits=4)
+    budget.record_discovery("a", urls=6)
+    budget.record_proposal("a")
+    budget.save()
+
+    budget = CreditBudget(path, month_budget=5)
+    assert budget.remaining() == 1
+    assert not budget.reserve("a", "scrape", credits=2)
+    budget.defer_url("a")
+    assert budget.summary() == "Credits: 0 (month 4/5) | Deferred (budget): 1 URLs (a: 1)"
+    assert budget.expected_urls("a") == 6
+    assert budget.expected_urls("b") == DEFAULT_EXPECTED_URLS
+    # Smoothed towards the type prior; a portal with a proposal ranks above a news feed
+    portal = {"municipality": "a", "type": "dedicated_portal"}
+    assert budget.expected_value(portal) == pytest.approx((1 + 3) / (4 + 10))
+    assert budget.expected_value(portal) > budget.expected_value({"municipality": "c", "type": "news_feed"})
+
+
+def test_budget_unlimited(tmp_path):
+    budget = CreditBudget(str(tmp_path / "budget.json"))
+    assert not budget.limited
+    assert budget.remaining() is None
+    assert budget.reserve("a", "scrape", credits=1000)
@@ -0,0 +1,8 @@
+from canonical import canonicalize_url
+
+
+def test_canonicalize_url():
+    assert canonicalize_url("http://WWW.Aarhus.dk:80/grunde/?utm_source=x&b=2&a=1#top") == "https://www.aarhus.dk/grunde?a=1&b=2"
+    assert canonicalize_url("https://aarhus.dk/grunde;jsessionid=ABC123/salg/?fbclid=1") == "https://aarhus.dk/grunde/salg"
+    assert canonicalize_url("https://aarhus.dk/") == "https://aarhus.dk/"
+    assert canonicalize_url(" mailto:grunde@aarhus.dk ") == "mailto:grunde@aarhus.dk"
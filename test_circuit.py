@@ -0,0 +1,49 @@
+import requests
+
+from circuit import CircuitBreaker, SiteFailure, is_site_failure
+from retry import RetryBudgetExceeded
+
+
+def _connection_error(url):
+    return requests.ConnectionError("refused", request=requests.Request("GET", url).prepare())
+
+
+def test_is_site_failure():
+    url = "https://aarhus.dk/grunde"
+    assert is_site_failure(url, SiteFailure("Page returned HTTP 503"))
+    assert is_site_failure(url, _connection_error("https://aarhus.dk/robots.txt"))
+    assert is_site_failure(url, Exception("crawl4ai failed: net::ERR_CONNECTION_REFUSED"))
+    # Errors that say nothing about the site itself
+    assert not is_site_failure(url, _connection_error("https://api.firecrawl.dev/v1/scrape"))
+    assert not is_site_failure(url, requests.ConnectionError("no request attached"))
+    assert not is_site_failure(url, RetryBudgetExceeded("Retry budget exhausted"))
+    assert not is_site_failure(url, AttributeError("'NoneType' object has no attribute 'scrape'"))
+
+
+def test_circuit_opens_after_threshold(tmp_path):
+    breaker = CircuitBreaker(str(tmp_path / "circuits.json"), threshold=2)
+    breaker.record_failure("https://a.dk/1")
+    breaker.record_success("https://a.dk/2")
+    breaker.record_failure("https://a.dk/3")
+    assert breaker.allow("https://a.dk/4")
+    breaker.record_failure("https://a.dk/4")
+    assert not breaker.allow("https://a.dk/5")
+    assert breaker.allow("https://b.dk/1")
+    assert breaker.open_hosts() == ["a.dk"]
+
+
+def test_circuit_half_open_next_run(tmp_path):
+    path = str(tmp_path / "circuits.json")
+    breaker = CircuitBreaker(path, threshold=1)
+    breaker.record_failure("https://a.dk/1")
+    breaker.record_failure("https://b.dk/1")
+    breaker.save()
+
+    # Open domains start the next run half-open: one result decides
+    breaker = CircuitBreaker(path, threshold=3)
+    assert breaker.allow("https://a.dk/2") and breaker.allow("https://b.dk/2")
+    breaker.record_success("https://a.dk/2")
+    breaker.record_failure("https://b.dk/2")
+    assert breaker.open_hosts() == ["b.dk"]
+    breaker.save()
+    assert list(CircuitBreaker(path)._opened) == ["b.dk"]
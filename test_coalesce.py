@@ -0,0 +1,56 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from coalesce import SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "page"
+
+    with ThreadPoolExecutor(3) as pool:
+        leader = pool.submit(flight.do, "https://aarhus.dk/grunde", fetch)
+        started.wait(5)
+        waiters = [pool.submit(flight.do, "https://aarhus.dk/grunde", fetch) for _ in range(2)]
+        while flight.coalesced < 2:
+            time.sleep(0.01)
+        release.set()
+        assert leader.result() == ("page", False)
+        assert [waiter.result() for waiter in waiters] == [("page", True)] * 2
+    assert len(calls) == 1
+
+    # Nothing is cached once the call has finished
+    assert flight.do("https://aarhus.dk/grunde", lambda: "again") == ("again", False)
+
+
+def test_single_flight_shares_errors():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise ValueError("down")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(flight.do, "key", fail)
+        started.wait(5)
+        waiter = pool.submit(flight.do, "key", fail)
+        while not flight.coalesced:
+            time.sleep(0.01)
+        release.set()
+        for future in (leader, waiter):
+            with pytest.raises(ValueError):
+                future.result()
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+from canonical import canonicalize_url
+from feeds import FeedDiscovery, parse_feed, parse_feed_date
+
+RSS = b"""<?xml version="1.0"?><rss version="2.0"><channel>
+<item><title>Nye grunde i Lystrup</title><link>/nyheder/grunde-lystrup</link>
+  <description>&lt;p&gt;Byggegrunde   til salg&lt;/p&gt;</description><pubDate>Mon, 05 Jan 2026 10:00:00 +0100</pubDate></item>
+<item><title>Vejarbejde</title><link>https://aarhus.dk/nyheder/vej</link><pubDate>Tue, 06 Jan 2026 10:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+ATOM = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+<entry><title>Erhvervsgrund udbudt</title><link rel="alternate" href="https://aarhus.dk/nyheder/erhverv"/>
+  <link rel="enclosure" href="https://aarhus.dk/udbud.pdf"/><updated>2026-01-07T09:00:00Z</updated></entry>
+</feed>"""
+
+
+def test_parse_feed_date():
+    assert parse_feed_date("Mon, 05 Jan 2026 10:00:00 +0100") == datetime(2026, 1, 5, 9, tzinfo=timezone.utc)
+    assert parse_feed_date("2026-01-07T09:00:00Z") == datetime(2026, 1, 7, 9, tzinfo=timezone.utc)
+    assert parse_feed_date("") is None
+
+
+def test_parse_feed():
+    rss = parse_feed(RSS, "https://aarhus.dk/")
+    assert [item["url"] for item in rss] == ["https://aarhus.dk/nyheder/grunde-lystrup", "https://aarhus.dk/nyheder/vej"]
+    assert rss[0]["summary"] == "Byggegrunde til salg"
+    atom = parse_feed(ATOM, "https://aarhus.dk/")
+    assert atom == [{
+        "url": "https://aarhus.dk/nyheder/erhverv",
+        "title": "Erhvervsgrund udbudt",
+        "summary": "",
+        "published": datetime(2026, 1, 7, 9, tzinfo=timezone.utc),
+    }]
+
+
+class _Response:
+    def __init__(self, content, status_code=200, headers=None):
+        self.content = content
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.url = "https://aarhus.dk/rss"
+
+
+def _rss(titles):
+    items = "".join(
+        f"<item><title>{title}</title><link>https://aarhus.dk/nyheder/{i}</link>"
+        f"<pubDate>Mon, 0{i} Feb 2026 10:00:00 GMT</pubDate></item>"
+        for i, title in enumerate(titles, 1)
+    )
+    return f'<?xml version="1.0"?><rss version="2.0"><channel>{items}</channel></rss>'.encode()
+
+
+class _Session:
+    def __init__(self, document):
+        self.document = document
+        self.headers = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.headers.append(headers)
+        if headers and headers.get("If-None-Match") == "v1":
+            return _Response(b"", 304)
+        return _Response(self.document[0], headers={"ETag": "v1"})
+
+
+def test_feed_discovery_limit_and_watermark(tmp_path):
+    source = {"municipality": "aarhus", "url": "https://aarhus.dk/nyheder"}
+    document = [_rss(["Grund 1", "Vejarbejde", "Grund 3", "Grund 4"])]
+    discovery = FeedDiscovery(str(tmp_path / "feeds.json"))
+    discovery._find_feeds = lambda base_url: ["https://aarhus.dk/rss"]
+    discovery.session = _Session(document)
+
+    # Cut off at the limit: newest first, watermark and ETag stay put
+    first = discovery.discover(source, "grund", limit=2)
+    assert [item["url"] for item in first] == ["https://aarhus.dk/nyheder/4", "https://aarhus.dk/nyheder/3"]
+    assert discovery.state["aarhus"]["watermark"] == "1970-01-01T00:00:00+00:00"
+    assert discovery.state["aarhus"].get("etag") is None
+
+    # Once the returned items are seen nothing is cut off, so both move
+    seen = {canonicalize_url(item["url"]) for item in first}
+    rest = discovery.discover(source, "grund", limit=2, seen_urls=seen)
+    assert [item["url"] for item in rest] == ["https://aarhus.dk/nyheder/1"]
+    assert discovery.state["aarhus"]["watermark"] == "2026-02-04T10:00:00+00:00"
+
+    # Unchanged feed: a 304 and nothing new
+    assert discovery.discover(source, "grund", limit=2) == []
+    assert discovery.session.headers[-1] == {"If-None-Match": "v1"}
@@ -0,0 +1,55 @@
+import pytest
+import requests
+
+from fake_firecrawl import FakeFirecrawlApp
+from firecrawl_batch import FirecrawlBatchClient
+from retry import RetryPolicy
+
+
+def test_fake_firecrawl_app():
+    app = FakeFirecrawlApp(latency=0)
+    page = app.scrape_url("https://aarhus.dk/grunde/salg")
+    assert page == app.scrape_url("https://aarhus.dk/grunde/salg")
+    assert page["metadata"]["statusCode"] == 200
+    assert page["links"][0].startswith("https://aarhus.dk/grunde/")
+    assert app.scrape_url("https://aarhus.dk/404")["metadata"]["statusCode"] == 404
+    with pytest.raises(requests.exceptions.HTTPError):
+        app.scrape_url("https://aarhus.dk/fail")
+    assert app.map_url("https://aarhus.dk/", {"limit": 3}) == [f"https://aarhus.dk/grund-{i}" for i in range(3)]
+    assert app.calls == {"scrape_url": 4, "map_url": 1, "batch": 0}
+
+    job = app.async_batch_scrape_urls(["https://aarhus.dk/a", "https://aarhus.dk/fail"])
+    status = app.check_batch_scrape_status(job["id"])
+    assert status["status"] == "completed"
+    assert [page["metadata"]["statusCode"] for page in status["data"]] == [200, 500]
+
+
+def _flaky(app, failures):
+    check = app.check_batch_scrape_status
+
+    def status(job_id):
+        if failures:
+            raise failures.pop(0)
+        return check(job_id)
+    app.check_batch_scrape_status = status
+
+
+def test_batch_poll_is_retried(monkeypatch):
+    monkeypatch.setattr("retry.time.sleep", lambda seconds: None)
+    app = FakeFirecrawlApp(latency=0)
+    _flaky(app, [requests.exceptions.ConnectionError("reset")])
+    client = FirecrawlBatchClient(app)
+    urls = ["https://aarhus.dk/a", "https://aarhus.dk/b"]
+    job_id = client.start(urls)
+    results = list(client.iter_results(job_id, urls, poll_interval=0, retry=RetryPolicy().call))
+    assert [(url, error) for url, _, error in results] == [(url, None) for url in urls]
+
+
+def test_batch_poll_failure_yields_every_pending_url():
+    app = FakeFirecrawlApp(latency=0)
+    _flaky(app, [requests.exceptions.ConnectionError("reset")])
+    client = FirecrawlBatchClient(app)
+    urls = ["https://aarhus.dk/a", "https://aarhus.dk/b"]
+    results = list(client.iter_results(client.start(urls), urls, poll_interval=0))
+    assert [url for url, _, _ in results] == urls
+    assert all(result is None and error.startswith("Batch status check failed") for _, result, error in results)
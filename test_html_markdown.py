@@ -0,0 +1,24 @@
+from html_markdown import html_to_markdown
+
+
+def test_html_to_markdown():
+    html = """<html><head><title>Grunde</title><script>var x = 1;</script></head><body>
+    <nav><a href="/">Forside</a></nav>
+    <main>
+      <h1>Grunde til salg</h1>
+      <p>Se <a href="/grunde/salg?id=1">ledige   grunde</a> i <strong>Lystrup</strong>.</p>
+      <ul><li>Parcelhusgrund</li><li><em>Erhvervsgrund</em></li></ul>
+      <a href="#top">Til toppen</a> <a href="mailto:grunde@aarhus.dk">Mail</a>
+    </main>
+    <footer><a href="https://aarhus.dk/kontakt">Kontakt</a></footer>
+    </body></html>"""
+    markdown, links = html_to_markdown(html, "https://aarhus.dk/grunde/")
+    assert markdown == (
+        "# Grunde til salg\n\n"
+        "Se [ledige grunde](https://aarhus.dk/grunde/salg?id=1) i **Lystrup**.\n\n"
+        "- Parcelhusgrund\n"
+        "- _Erhvervsgrund_\n"
+        "Til toppen Mail"
+    )
+    # Chrome links are kept for discovery, fragments and mailto are not
+    assert links == ["https://aarhus.dk/", "https://aarhus.dk/grunde/salg?id=1", "https://aarhus.dk/kontakt"]
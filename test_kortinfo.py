@@ -0,0 +1,55 @@
+from canonical import canonicalize_url
+from kortinfo import KortinfoDataLayer, extract_plots
+
+
+def test_extract_plots():
+    data = {
+        "type": "FeatureCollection",
+        "features": [
+            {"properties": {"GrundId": 12, "Salgsstatus": "Ledig", "Link": "/grunde/12"}},
+            {"properties": {"grundid": "13", "status": "Solgt"}},
+            {"properties": {"navn": "Legeplads"}},
+        ],
+    }
+    assert extract_plots(data) == [
+        {"id": "12", "status": "Ledig", "url": "/grunde/12"},
+        {"id": "13", "status": "Solgt", "url": None},
+    ]
+    assert extract_plots([]) == []
+
+
+class _Response:
+    status_code = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    def json(self):
+        return self.data
+
+
+class _Session:
+    def __init__(self, plots):
+        self.plots = plots
+
+    def get(self, url, headers=None, timeout=None):
+        return _Response({"plots": self.plots[0]})
+
+
+def test_kortinfo_only_returns_changes(tmp_path):
+    source = {"municipality": "odder", "url": "https://odder.kortinfo.net/grundsalg", "data_url": "https://odder.kortinfo.net/api/plots"}
+    plots = [[{"id": 1, "status": "Ledig", "url": "/grunde/1"}, {"id": 2, "status": "Ledig"}]]
+    layer = KortinfoDataLayer(str(tmp_path / "kortinfo.json"))
+    layer.session = _Session(plots)
+
+    # First run: every plot is new; the plot without a page leads to the landing page
+    assert layer.discover(source) == ["https://odder.kortinfo.net/grunde/1", "https://odder.kortinfo.net/grundsalg"]
+    assert layer.refresh == {canonicalize_url(source["url"])}
+
+    # Unchanged plots lead nowhere, a status change does
+    layer.refresh.clear()
+    assert layer.discover(source) == []
+    plots[0] = [{"id": 1, "status": "Solgt", "url": "/grunde/1"}, {"id": 2, "status": "Ledig"}]
+    assert layer.discover(source) == ["https://odder.kortinfo.net/grunde/1"]
+    assert layer.changes["odder"] == {"new": [], "status_changed": ["1"]}
+    assert not layer.refresh
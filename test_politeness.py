@@ -0,0 +1,88 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from politeness import HostScheduler, RobotsCache
+
+
+class _ManualExecutor:
+    """Holds submitted tasks until the test runs them."""
+
+    def __init__(self):
+        self.tasks = []
+
+    def submit(self, fn, *args):
+        self.tasks.append((fn, args))
+
+    def run_next(self):
+        fn, args = self.tasks.pop(0)
+        fn(*args)
+
+
+def test_scheduler_round_robin_and_host_concurrency():
+    executor = _ManualExecutor()
+    done = []
+    scheduler = HostScheduler(executor, max_in_flight=10, per_host_concurrency=1, per_host_delay=0)
+    for url in ["https://a.dk/1", "https://a.dk/2", "https://b.dk/1"]:
+        scheduler.submit(url, done.append, url)
+
+    # One task per host in flight; a.dk's second URL waits for its first
+    assert [args[1] for _, args in executor.tasks] == ["https://a.dk/1", "https://b.dk/1"]
+    executor.run_next()
+    assert [args[1] for _, args in executor.tasks] == ["https://b.dk/1", "https://a.dk/2"]
+    executor.run_next()
+    executor.run_next()
+    assert done == ["https://a.dk/1", "https://b.dk/1", "https://a.dk/2"]
+    assert scheduler.pending == 0
+
+
+def test_scheduler_delay_and_robots():
+    class Robots:
+        def crawl_delay(self, url):
+            return 0.2 if "slow" in url else None
+
+    starts = {}
+
+    def task(url):
+        starts.setdefault(url.split("/")[2], []).append(time.monotonic())
+
+    with ThreadPoolExecutor(4) as pool:
+        scheduler = HostScheduler(pool, max_in_flight=4, per_host_concurrency=2, per_host_delay=0.05, robots=Robots())
+        for i in range(3):
+            scheduler.submit(f"https://fast.dk/{i}", task, f"https://fast.dk/{i}")
+            scheduler.submit(f"https://slow.dk/{i}", task, f"https://slow.dk/{i}")
+        scheduler.wait()
+
+    fast, slow = starts["fast.dk"], starts["slow.dk"]
+    assert all(b - a >= 0.04 for a, b in zip(fast, fast[1:]))
+    # The robots.txt Crawl-delay replaces the shorter default once it is known
+    assert slow[2] - slow[1] >= 0.19
+
+
+def test_scheduler_survives_crashing_task():
+    def crash():
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        scheduler = HostScheduler(pool, max_in_flight=2, per_host_delay=0)
+        scheduler.submit("https://a.dk/1", crash)
+        scheduler.wait()
+    assert scheduler.pending == 0 and scheduler.in_flight == 0
+
+
+def test_robots_crawl_delay_is_cached_and_capped():
+    class Response:
+        status_code = 200
+        text = "User-agent: GrundsalgMonitor\nCrawl-delay: 120\n\nUser-agent: *\nDisallow:\n"
+
+    class Session:
+        calls = 0
+
+        def get(self, url, timeout):
+            Session.calls += 1
+            return Response()
+
+    robots = RobotsCache()
+    robots.session = Session()
+    assert robots.crawl_delay("https://a.dk/grunde") == 30.0
+    assert robots.crawl_delay("https://a.dk/other") == 30.0
+    assert Session.calls == 1
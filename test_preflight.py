@@ -0,0 +1,65 @@
+import requests
+
+from preflight import Preflight
+
+
+class _Response:
+    def __init__(self, url, status_code=200, headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers or {"Content-Type": "text/html; charset=utf-8"}
+
+    def close(self):
+        pass
+
+
+class _Session:
+    """Answers HEAD and GET from a url -> (method -> response) table."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.calls = []
+
+    def _answer(self, method, url):
+        self.calls.append((method, url))
+        response = self.responses[url].get(method)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def head(self, url, **kwargs):
+        return self._answer("HEAD", url)
+
+    def get(self, url, **kwargs):
+        return self._answer("GET", url)
+
+
+def _preflight(responses):
+    preflight = Preflight(max_bytes=1024)
+    preflight.session = _Session(responses)
+    return preflight
+
+
+def test_preflight_checks():
+    url = "https://aarhus.dk/grunde"
+    pdf = _Response(url, headers={"Content-Type": "application/pdf"})
+    big = _Response(url, headers={"Content-Type": "text/html", "Content-Length": "4096"})
+    moved = _Response("https://aarhus.dk/grunde/salg/")
+    assert _preflight({url: {"HEAD": _Response(url)}}).check(url) == (True, "ok", url)
+    assert _preflight({url: {"HEAD": pdf}}).check(url) == (False, "non_html: application/pdf", url)
+    assert _preflight({url: {"HEAD": big}}).check(url) == (False, "oversized: 4 KB", url)
+    assert _preflight({url: {"HEAD": moved}}).check(url, {"https://aarhus.dk/grunde/salg"}) == \
+        (False, "redirect_to_seen", "https://aarhus.dk/grunde/salg/")
+    assert _preflight({url: {"HEAD": moved}}).check(url, set()) == (True, "ok", "https://aarhus.dk/grunde/salg/")
+
+
+def test_preflight_falls_back_to_get_and_fails_open():
+    url = "https://aarhus.dk/grunde"
+    preflight = _preflight({url: {"HEAD": _Response(url, 405), "GET": _Response(url)}})
+    assert preflight.check(url) == (True, "ok", url)
+    assert preflight.session.calls == [("HEAD", url), ("GET", url)]
+
+    # Error statuses and network errors are left to the scrape and retry policy
+    assert _preflight({url: {"HEAD": _Response(url, 404)}}).check(url) == (True, "preflight_status_404", url)
+    timeout = _preflight({url: {"HEAD": requests.Timeout("slow")}})
+    assert timeout.check(url) == (True, "preflight_error: Timeout", url)
@@ -0,0 +1,20 @@
+import pytest
+
+from ratelimit import RateLimiter
+
+
+def test_rate_limiter_waits_only_when_empty(monkeypatch):
+    slept = []
+    monkeypatch.setattr("ratelimit.time.sleep", slept.append)
+    limiter = RateLimiter(60, name="test")
+    assert all(limiter.acquire() == 0.0 for _ in range(60))
+    assert limiter.acquire() == pytest.approx(1.0, abs=0.05)
+    assert len(slept) == 1
+    assert limiter.stats()["calls"] == 61
+
+
+def test_rate_limiter_plans():
+    assert RateLimiter.for_firecrawl_plan("hobby").capacity == 100
+    assert RateLimiter.for_firecrawl_plan("unknown").capacity == 15
+    with pytest.raises(ValueError):
+        RateLimiter(0)
@@ -0,0 +1,71 @@
+import pytest
+import requests
+
+from retry import PERMANENT, RATE_LIMITED, TRANSIENT, RetryBudgetExceeded, RetryPolicy, classify_error, parse_retry_after
+
+
+def _http_error(status, headers=None):
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    return requests.exceptions.HTTPError(f"HTTP {status}", response=response)
+
+
+def test_classify_error():
+    assert classify_error(_http_error(429, {"Retry-After": "12"})) == (RATE_LIMITED, 12.0)
+    assert classify_error(_http_error(404)) == (PERMANENT, None)
+    assert classify_error(_http_error(503)) == (TRANSIENT, None)
+    # Plain exceptions fall back to the message
+    assert classify_error(Exception("Payment Required: Insufficient credits")) == (PERMANENT, None)
+    assert classify_error(Exception("Rate limit exceeded")) == (RATE_LIMITED, None)
+    assert classify_error(requests.exceptions.ConnectionError("reset")) == (TRANSIENT, None)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def _failing(errors, result="ok"):
+    errors = list(errors)
+
+    def fn():
+        if errors:
+            raise errors.pop(0)
+        return result
+    return fn
+
+
+def test_retry_policy_retries_transient_and_rate_limited(monkeypatch):
+    slept = []
+    monkeypatch.setattr("retry.time.sleep", slept.append)
+    policy = RetryPolicy(max_retries=3, base_delay=1, rate_limit_delay=7)
+    fn = _failing([_http_error(503), _http_error(429), _http_error(429, {"Retry-After": "3"})])
+    assert policy.call(fn, "test") == "ok"
+    assert 0.5 <= slept[0] <= 1.5
+    assert slept[1:] == [7, 3.0]
+    assert policy.stats()["retries"] == 3
+
+
+def test_retry_policy_fails_fast_on_permanent_errors(monkeypatch):
+    monkeypatch.setattr("retry.time.sleep", lambda delay: pytest.fail("slept on a permanent error"))
+    with pytest.raises(requests.exceptions.HTTPError):
+        RetryPolicy().call(_failing([_http_error(402)]))
+
+
+def test_retry_policy_gives_up_after_max_retries(monkeypatch):
+    monkeypatch.setattr("retry.time.sleep", lambda delay: None)
+    policy = RetryPolicy(max_retries=2)
+    with pytest.raises(requests.exceptions.HTTPError):
+        policy.call(_failing([_http_error(503)] * 3))
+    assert policy.retries == 2
+
+
+def test_retry_policy_budget(monkeypatch):
+    monkeypatch.setattr("retry.time.sleep", lambda delay: None)
+    policy = RetryPolicy(rate_limit_delay=30, budget_seconds=45)
+    with pytest.raises(RetryBudgetExceeded):
+        policy.call(_failing([_http_error(429)] * 2))
+    assert policy.stats() == {"retries": 1, "waited_seconds": 30.0, "budget_exhausted": 1}
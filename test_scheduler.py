@@ -0,0 +1,43 @@
+from datetime import datetime, timedelta, timezone
+
+from scheduler import CrawlScheduler
+
+
+def _days_until_due(scheduler, source_id):
+    next_due = datetime.fromisoformat(scheduler.history[source_id]["next_due"])
+    return round((next_due - datetime.now(timezone.utc)).total_seconds() / 86400, 1)
+
+
+def test_scheduler_intervals(tmp_path):
+    path = str(tmp_path / "schedule.json")
+    scheduler = CrawlScheduler(path, base_days=2, min_days=1, max_days=4)
+    sources = {name: {"municipality": name} for name in ("quiet", "busy", "down", "pinned")}
+    sources["pinned"]["scan_interval_days"] = 7
+    assert scheduler.due_sources(list(sources.values())) == list(sources.values())
+
+    scheduler.record_scan(sources["quiet"])
+    scheduler.record_scan(sources["busy"], urls=3)
+    scheduler.record_proposal("busy")
+    scheduler.record_scan(sources["down"], failed=True)
+    scheduler.record_scan(sources["pinned"])
+    scheduler.save()
+    # Nothing found grows the interval by half, a proposal halves it
+    assert scheduler.history["quiet"]["interval_days"] == 3
+    assert scheduler.history["busy"]["interval_days"] == 1
+    assert _days_until_due(scheduler, "down") == 2
+    assert _days_until_due(scheduler, "pinned") == 7
+
+    # Repeated failures back off by one base interval each, capped at max_days
+    for _ in range(3):
+        scheduler = CrawlScheduler(path, base_days=2, min_days=1, max_days=4)
+        scheduler.record_scan(sources["down"], failed=True)
+        scheduler.save()
+    assert scheduler.history["down"]["consecutive_failures"] == 4
+    assert _days_until_due(scheduler, "down") == 4
+
+    # Only sources whose next scan has come (give or take the slack) are due
+    scheduler = CrawlScheduler(path)
+    scheduler.history["quiet"]["next_due"] = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    scheduler.history["busy"]["next_due"] = (datetime.now(timezone.utc) - timedelta(days=1)).isoformat()
+    assert scheduler.due_sources(list(sources.values())) == [sources["busy"], sources["quiet"]]
+    assert sorted(scheduler.stats()["not_due"]) == ["down", "pinned"]
@@ -0,0 +1,38 @@
+import itertools
+
+from scrape_cache import ScrapeCache, content_hash
+
+
+def test_scrape_cache_hit_by_canonical_url(tmp_path):
+    cache = ScrapeCache(str(tmp_path / "cache.sqlite"))
+    cache.put("https://www.aarhus.dk/grunde/?utm_source=x", {"markdown": "Grunde", "links": ["https://aarhus.dk/a"]}, "dedicated_portal")
+    result = cache.get("https://www.aarhus.dk/grunde", "dedicated_portal", ["markdown", "links"])
+    assert result["markdown"] == "Grunde" and result["links"] == ["https://aarhus.dk/a"]
+    assert result["content_hash"] == content_hash("Grunde")
+
+    # Markdown-only entries cannot answer a request for links
+    cache.put("https://aarhus.dk/salg", {"markdown": "Salg"})
+    assert cache.get("https://aarhus.dk/salg", formats=["markdown"])["markdown"] == "Salg"
+    assert cache.get("https://aarhus.dk/salg", formats=["markdown", "links"]) is None
+    assert cache.stats() == {"hits": 2, "misses": 1}
+    cache.close()
+
+
+def test_scrape_cache_expiry_and_eviction(tmp_path, monkeypatch):
+    clock = itertools.count(1000.0, 60.0)
+    tick = clock.__next__
+    monkeypatch.setattr("scrape_cache.time.time", tick)
+    cache = ScrapeCache(str(tmp_path / "cache.sqlite"), max_bytes=250, ttl_hours={"news_feed": 0.05})
+    for i in range(3):
+        cache.put(f"https://aarhus.dk/{i}", {"markdown": "x" * 100})
+    # Over 250 bytes: the oldest rows go until the cache is under 90% of the limit
+    assert cache.get("https://aarhus.dk/0") is None
+    assert cache.get("https://aarhus.dk/1") is not None
+    assert cache.get("https://aarhus.dk/2") is not None
+
+    # news_feed pages expire after 3 minutes; each clock tick is one minute
+    cache.put("https://aarhus.dk/feed", {"markdown": "y"}, "news_feed")
+    assert cache.get("https://aarhus.dk/feed", "news_feed") is not None
+    tick(), tick()
+    assert cache.get("https://aarhus.dk/feed", "news_feed") is None
+    cache.close()
@@ -0,0 +1,50 @@
+import io
+
+from canonical import canonicalize_url
+from sitemap import SitemapDiscovery
+
+
+class _Response:
+    def close(self):
+        pass
+
+
+def _sitemap(entries):
+    urls = "".join(f"<url><loc>{loc}</loc><lastmod>{lastmod}</lastmod></url>" for loc, lastmod in entries)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode()
+
+
+def _discovery(tmp_path, document):
+    discovery = SitemapDiscovery(str(tmp_path / "sitemaps.json"))
+    discovery._find_sitemaps = lambda base_url: ["https://aarhus.dk/sitemap.xml"]
+    discovery._open = lambda url: (_Response(), io.BytesIO(document[0]))
+    return discovery
+
+
+def test_sitemap_watermark_across_runs(tmp_path):
+    source = {"municipality": "aarhus", "url": "https://aarhus.dk/grunde"}
+    document = [_sitemap([
+        ("https://aarhus.dk/grunde/a", "2026-01-01"),
+        ("https://aarhus.dk/grunde/b", "2026-01-02"),
+        ("https://aarhus.dk/grunde/c", "2026-01-03"),
+        ("https://aarhus.dk/om-kommunen", "2026-01-04"),
+    ])]
+    discovery = _discovery(tmp_path, document)
+
+    # Cut off at the limit: newest first, and the watermark stays put
+    first = discovery.discover(source, "grund", limit=2)
+    assert first == ["https://aarhus.dk/grunde/c", "https://aarhus.dk/grunde/b"]
+    assert "watermark" not in discovery.state["aarhus"]
+
+    # Seen URLs make room for the rest; nothing cut off, so the watermark moves
+    seen = {canonicalize_url(url) for url in first}
+    assert discovery.discover(source, "grund", limit=2, seen_urls=seen) == ["https://aarhus.dk/grunde/a"]
+    discovery.save()
+
+    # A new run only returns what changed after the watermark
+    document[0] = _sitemap([
+        ("https://aarhus.dk/grunde/a", "2026-01-01"),
+        ("https://aarhus.dk/grunde/d", "2026-02-01"),
+    ])
+    discovery = _discovery(tmp_path, document)
+    assert discovery.discover(source, "grund", limit=2) == ["https://aarhus.dk/grunde/d"]
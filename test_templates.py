@@ -0,0 +1,32 @@
+from templates import TemplateStats, url_template
+
+
+def test_url_template():
+    assert url_template("https://www.aarhus.dk/nyheder/job-sosu-assistent-123") == "aarhus.dk/nyheder/job-*"
+    assert url_template("https://aarhus.dk/nyheder/2026/01/grunde-i-lystrup") == "aarhus.dk/nyheder/*/*/grunde-*"
+    assert url_template("https://aarhus.dk/sag/4711") == "aarhus.dk/sag/*"
+    assert url_template("https://aarhus.dk/") == "aarhus.dk/"
+
+
+def test_template_skip_and_resample(tmp_path):
+    path = str(tmp_path / "templates.json")
+    stats = TemplateStats(path, min_samples=3, resample_days=14)
+    stats.seed([f"https://aarhus.dk/nyheder/job-{i}" for i in ("a", "b", "c")], [])
+    stats.record("https://aarhus.dk/grunde/salg-1", proposal=True)
+    assert not stats.should_skip("https://aarhus.dk/grunde/salg-2")
+
+    # One URL of a barren template is let through as the sample, the rest are skipped
+    assert not stats.should_skip("https://aarhus.dk/nyheder/job-d")
+    assert stats.should_skip("https://aarhus.dk/nyheder/job-e")
+    # A sample cut by the discovery cap is not admitted: next run it is due again
+    stats.save()
+    stats = TemplateStats(path, min_samples=3, resample_days=14)
+    assert not stats.should_skip("https://aarhus.dk/nyheder/job-f")
+
+    # Admitted samples start the resample window
+    stats.sampled("https://aarhus.dk/nyheder/job-f")
+    stats.sampled("https://aarhus.dk/nyheder/job-g")
+    stats.save()
+    stats = TemplateStats(path, min_samples=3, resample_days=14)
+    assert stats.should_skip("https://aarhus.dk/nyheder/job-h")
+    assert stats.templates["aarhus.dk/nyheder/job-*"]["skipped"] == 2
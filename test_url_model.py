@@ -0,0 +1,21 @@
+from url_model import UrlScorer, url_features
+
+
+def test_url_features():
+    assert sorted(url_features("https://www.aarhus.dk/grunde/123/salg.pdf?id=4")) == sorted([
+        "host:aarhus.dk", "depth:3", "tok:grunde", "tok:salg", "tok:pdf",
+        "numeric_segment", "ext:pdf", "query", "qp:id",
+    ])
+
+
+def test_url_scorer_ranks_listings_first(tmp_path):
+    positives = [f"https://aarhus.dk/grunde/parcelhusgrund-{i}" for i in range(20)]
+    negatives = [f"https://aarhus.dk/nyheder/job-{i}" for i in range(60)]
+    scorer = UrlScorer.train(positives, negatives)
+    listing, news = scorer.score_many(["https://aarhus.dk/grunde/parcelhusgrund-lystrup", "https://aarhus.dk/nyheder/job-sosu"])
+    assert listing > 0.5 > news
+
+    path = str(tmp_path / "url_model.json")
+    scorer.save(path, trained_on=80)
+    assert UrlScorer.load(path).score_many(["https://aarhus.dk/grunde/x"]) == scorer.score_many(["https://aarhus.dk/grunde/x"])
+    assert UrlScorer.load(str(tmp_path / "missing.json")) is None
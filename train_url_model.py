@@ -0,0 +1,45 @@
+"""
+Train the URL scoring model (url_model.json) from the Sheets history.
+
+Positives are proposal URLs; negatives are every other seen URL (scraped and
+found irrelevant, or not a listing). Re-run after a few weeks of new history
+and commit the updated url_model.json.
+
+Usage: python train_url_model.py [--output url_model.json]
+"""
+import sys
+from datetime import datetime, timezone
+
+from canonical import canonicalize_url
+from sheets import get_rows
+from url_model import UrlScorer
+
+
+def main():
+    output = sys.argv[sys.argv.index("--output") + 1] if "--output" in sys.argv else "url_model.json"
+    proposals = {canonicalize_url(row[3]) for row in get_rows("proposals") if len(row) > 3 and str(row[3]).startswith("http")}
+    seen = {canonicalize_url(row[0]) for row in get_rows("seen_urls") if row and str(row[0]).startswith("http")}
+    positives = sorted(proposals)
+    negatives = sorted(seen - proposals)
+    if not positives or not negatives:
+        print(f"Not enough history to train ({len(positives)} proposals, {len(negatives)} other URLs)")
+        return
+
+    model = UrlScorer.train(positives, negatives)
+    scores = model.score_many(positives + negatives)
+    predicted = [score >= 0.5 for score in scores]
+    recall = sum(predicted[:len(positives)]) / len(positives)
+    kept = sum(predicted) / len(predicted)
+    print(f"Trained on {len(positives)} proposals / {len(negatives)} other URLs, {len(model.weights)} features")
+    print(f"Training recall {recall:.0%}, URLs kept at 0.5: {kept:.0%}")
+    model.save(
+        output,
+        trained_at=datetime.now(timezone.utc).isoformat(),
+        positives=len(positives),
+        negatives=len(negatives)
+    )
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import json
+import math
+import random
+import re
+from typing import Iterable, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+TOKEN = re.compile(r"[a-zæøå0-9]+")
+MAX_DEPTH = 6
+
+
+def url_features(url: str) -> List[str]:
+    """Lexical features of a URL: path tokens, depth, query parameter names, domain and extension."""
+    parts = urlsplit(url.lower())
+    host = parts.netloc[4:] if parts.netloc.startswith("www.") else parts.netloc
+    segments = [segment for segment in parts.path.split("/") if segment]
+    features = [f"host:{host}", f"depth:{min(len(segments), MAX_DEPTH)}"]
+    for token in set(TOKEN.findall(parts.path)):
+        if not token.isdigit():
+            features.append(f"tok:{token}")
+    if any(segment.isdigit() for segment in segments):
+        features.append("numeric_segment")
+    if segments and "." in segments[-1]:
+        features.append(f"ext:{segments[-1].rsplit('.', 1)[-1]}")
+    if parts.query:
+        features.append("query")
+        features.extend(f"qp:{key}" for key, _ in parse_qsl(parts.query, keep_blank_values=True))
+    return features
+
+
+class UrlScorer:
+    """
+    Logistic-regression URL scorer over sparse lexical features.
+
+    Weights are trained offline (train_url_model.py) from the proposals and
+    seen_urls sheets and stored as JSON. Scoring is a sparse dot product per
+    URL, so ranking thousands of URLs takes milliseconds.
+    """
+
+    def __init__(self, weights: dict, bias: float = 0.0):
+        self.weights = weights
+        self.bias = bias
+
+    @classmethod
+    def load(cls, path: str) -> Optional["UrlScorer"]:
+        """Load a trained model, or return None if there is none (scoring disabled)."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read URL model {path}: {e}")
+            return None
+        return cls(data.get("weights", {}), data.get("bias", 0.0))
+
+    def save(self, path: str, **meta):
+        with open(path, "w") as f:
+            json.dump({"bias": self.bias, "weights": self.weights, **meta}, f, indent=1, sort_keys=True, ensure_ascii=False)
+            f.write("\n")
+
+    def score_many(self, urls: Iterable[str]) -> List[float]:
+        """Probability that each URL is a property listing."""
+        weights = self.weights
+        scores = []
+        for url in urls:
+            z = self.bias + sum(weights.get(feature, 0.0) for feature in url_features(url))
+            scores.append(1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z)))))
+        return scores
+
+    @classmethod
+    def train(cls, positives: List[str], negatives: List[str], epochs: int = 20,
+              learning_rate: float = 0.1, l2: float = 1e-4, seed: int = 0) -> "UrlScorer":
+        """Fit with SGD; positives are up-weighted so both classes count equally."""
+        examples = [(url_features(url), 1.0) for url in positives] + [(url_features(url), 0.0) for url in negatives]
+        positive_weight = len(negatives) / max(1, len(positives))
+        model = cls({}, 0.0)
+        rng = random.Random(seed)
+        for epoch in range(epochs):
+            rng.shuffle(examples)
+            rate = learning_rate / (1 + epoch)
+            for features, label in examples:
+                z = model.bias + sum(model.weights.get(feature, 0.0) for feature in features)
+                error = label - 1.0 / (1.0 + math.exp(-max(-30.0, min(30.0, z))))
+                step = rate * error * (positive_weight if label else 1.0)
+                model.bias += step
+                for feature in features:
+                    weight = model.weights.get(feature, 0.0)
+                    model.weights[feature] = weight + step - rate * l2 * weight
+        model.weights = {feature: round(weight, 4) for feature, weight in model.weights.items() if abs(weight) >= 1e-3}
+        return model